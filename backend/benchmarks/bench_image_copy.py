@@ -0,0 +1,61 @@
+"""
+Compare per-slide image copying strategies on a template with a large logo.
+
+    cd backend
+    python -m benchmarks.bench_image_copy --slides 12 --image 3000x2000
+"""
+import argparse
+import io
+import time
+
+from core.generator import analyze_template, create_ppt_from_template, copy_template_visual_elements
+from benchmarks.synthetic import make_slide_data, make_template
+
+
+def _render(analysis, slide_data, shared_parts):
+    """Render with either the shared-part path ({}) or add_picture per slide (None)."""
+    from pptx import Presentation
+
+    prs = Presentation(io.BytesIO(analysis["master_bytes"]))
+    master_index, layout_index = analysis["layout"]
+    layout = prs.slide_masters[master_index].slide_layouts[layout_index]
+    start = time.perf_counter()
+    for _ in slide_data:
+        slide = prs.slides.add_slide(layout)
+        copy_template_visual_elements(analysis, slide, shared_parts)
+    copy_time = time.perf_counter() - start
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return copy_time, len(buffer.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=12)
+    parser.add_argument("--image", default="3000x2000", help="logo size as WIDTHxHEIGHT")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.image.lower().split("x"))
+    template = make_template(slide_count=1, shapes_per_slide=0, image_size=(width, height))
+    analysis = analyze_template(template)
+    slide_data = make_slide_data(args.slides)
+    blob_size = sum(len(blob) for blob in analysis["images"].values())
+    print(f"Template: {len(template) / 1e6:.1f} MB, logo blob {blob_size / 1e6:.1f} MB, {args.slides} slides")
+
+    for label, shared in (("add_picture per slide", False), ("shared image part", True)):
+        times = []
+        for _ in range(args.repeat):
+            copy_time, size = _render(analysis, slide_data, {} if shared else None)
+            times.append(copy_time)
+        best = min(times)
+        print(f"{label:>22}: {best * 1000:8.2f} ms copying ({best / args.slides * 1000:.3f} ms/slide), output {size / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    create_ppt_from_template(slide_data, io.BytesIO(), template_analysis=analysis)
+    print(f"{'full render':>22}: {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
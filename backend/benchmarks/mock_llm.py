@@ -0,0 +1,61 @@
+"""Deterministic local stand-in for the LLM providers."""
+import asyncio
+import json
+
+from core import llm_handler
+
+PROVIDER = "mock"
+
+
+class MockLLM:
+    """
+    Registers itself as the "mock" provider in llm_handler and answers every
+    prompt with the same JSON completion for slide_count slides, after an
+    optional simulated latency. The completion goes through the real
+    response parser, just like provider output.
+    """
+
+    def __init__(self, slide_count: int = 10, points_per_slide: int = 4, latency: float = 0.0):
+        self.slide_count = slide_count
+        self.points_per_slide = points_per_slide
+        self.latency = latency
+        self.calls = 0
+
+    def completion_text(self) -> str:
+        slides = [
+            {
+                "title": f"Section {i + 1}: generated heading",
+                "points": [
+                    f"Deterministic point {j + 1} for section {i + 1}, long enough to wrap like real bullets"
+                    for j in range(self.points_per_slide)
+                ],
+            }
+            for i in range(self.slide_count)
+        ]
+        return "Here is your presentation:\n```json\n" + json.dumps(slides, indent=2) + "\n```"
+
+    async def call(self, prompt: str, api_key: str):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return llm_handler._parse_llm_response(self.completion_text())
+
+    async def stream(self, prompt: str, api_key: str):
+        self.calls += 1
+        text = self.completion_text()
+        step = max(1, len(text) // 50)
+        for start in range(0, len(text), step):
+            if self.latency:
+                await asyncio.sleep(self.latency / 50)
+            yield text[start:start + step]
+
+    def install(self):
+        llm_handler._PROVIDER_CALLS[PROVIDER] = self.call
+        llm_handler._PROVIDER_STREAMS[PROVIDER] = self.stream
+        llm_handler.DEFAULT_MODELS[PROVIDER] = "mock-1"
+        return self
+
+    def uninstall(self):
+        llm_handler._PROVIDER_CALLS.pop(PROVIDER, None)
+        llm_handler._PROVIDER_STREAMS.pop(PROVIDER, None)
+        llm_handler.DEFAULT_MODELS.pop(PROVIDER, None)
@@ -0,0 +1,174 @@
+"""
+Benchmark the generation pipeline end to end with synthetic templates and a
+deterministic mock LLM.
+
+    cd backend
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --out new.json --compare bench.json
+
+For every template profile and deck size it reports per-stage latency
+(median / p95 / min, in ms), full-pipeline throughput, output file size and
+memory. Each scenario runs in a fresh process, so its peak RSS is its own
+rather than the high-water mark of every scenario before it; the growth
+over the process's RSS after imports is reported too. Results are written
+as JSON so runs can be compared.
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from pptx import Presentation
+
+from benchmarks.mock_llm import PROVIDER, MockLLM
+from benchmarks.synthetic import PROFILES, make_template
+from core import llm_handler
+from core.generator import DeckBuilder, analyze_template, find_best_content_slide
+from core.response_cache import response_cache
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+    }
+
+
+def _timed(stages: Dict[str, List[float]], name: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    stages.setdefault(name, []).append(time.perf_counter() - start)
+    return result
+
+
+def bench_scenario(profile: str, slide_count: int, repeat: int) -> Dict:
+    """Run one (template profile, deck size) scenario repeat times."""
+    baseline_rss = _peak_rss_mb()
+    template_bytes = make_template(**PROFILES[profile])
+    mock = MockLLM(slide_count=slide_count).install()
+    completion = mock.completion_text()
+    stages: Dict[str, List[float]] = {}
+    totals = []
+    output_size = 0
+
+    try:
+        for _ in range(repeat):
+            run_start = time.perf_counter()
+
+            # Template stages, all cold: parse, best-slide scan, full analysis
+            prs = _timed(stages, "template_parse", Presentation, io.BytesIO(template_bytes))
+            _timed(stages, "find_best_content_slide", find_best_content_slide, prs)
+            analysis = _timed(stages, "template_analysis", analyze_template, template_bytes)
+
+            # LLM stages: prompt construction, provider round-trip, parsing
+            prompt = _timed(stages, "prompt_build", llm_handler._build_prompt, "x" * 2000, "")
+            response_cache.clear()
+            slides, _ = _timed(
+                stages, "llm_call",
+                lambda: asyncio.run(llm_handler._call_provider(PROVIDER, prompt, "bench-key")),
+            )
+            _timed(stages, "parse_response", llm_handler._parse_llm_response, completion)
+
+            # Render stages
+            builder = _timed(stages, "render_open", DeckBuilder, analysis)
+            _timed(stages, "render_slides", lambda: [builder.add_slide(slide) for slide in slides])
+            output = io.BytesIO()
+            _timed(stages, "render_save", builder.save, output)
+            output_size = len(output.getvalue())
+
+            totals.append(time.perf_counter() - run_start)
+    finally:
+        mock.uninstall()
+
+    return {
+        "profile": profile,
+        "slides": slide_count,
+        "template_bytes": len(template_bytes),
+        "output_bytes": output_size,
+        "stages": {name: _summarize(samples) for name, samples in stages.items()},
+        "total": _summarize(totals),
+        "decks_per_second": round(len(totals) / sum(totals), 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "rss_growth_mb": round(_peak_rss_mb() - baseline_rss, 1),
+    }
+
+
+def run_isolated(profile: str, slide_count: int, repeat: int) -> Dict:
+    """Run bench_scenario in a fresh spawned process, so memory figures cover only that scenario."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(bench_scenario, profile, slide_count, repeat).result()
+
+
+def compare(current: Dict, baseline: Dict):
+    """Print median deltas between two result files."""
+    previous = {(r["profile"], r["slides"]): r for r in baseline["results"]}
+    print("\nChange vs baseline (median ms, negative is faster):")
+    for result in current["results"]:
+        base = previous.get((result["profile"], result["slides"]))
+        if base is None:
+            continue
+        label = f"{result['profile']}/{result['slides']}"
+        for stage, stats in list(result["stages"].items()) + [("total", result["total"])]:
+            old = (base["stages"].get(stage) if stage != "total" else base["total"])
+            if not old or not old["median_ms"]:
+                continue
+            delta = stats["median_ms"] - old["median_ms"]
+            print(f"  {label:<14} {stage:<24} {old['median_ms']:>10.2f} -> {stats['median_ms']:>10.2f} ({delta / old['median_ms'] * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="comma-separated template profiles")
+    parser.add_argument("--slides", default="1,10,100", help="comma-separated deck sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to diff against")
+    args = parser.parse_args()
+
+    results = []
+    for profile in args.profiles.split(","):
+        for slide_count in (int(n) for n in args.slides.split(",")):
+            result = run_isolated(profile, slide_count, args.repeat)
+            results.append(result)
+            stages = "  ".join(f"{name}={stats['median_ms']:.1f}" for name, stats in result["stages"].items())
+            print(
+                f"{profile:>8} {slide_count:>4} slides: total {result['total']['median_ms']:.1f} ms, "
+                f"{result['decks_per_second']:.2f} decks/s, {result['output_bytes'] / 1024:.0f} KiB, "
+                f"peak RSS {result['peak_rss_mb']} MB (+{result['rss_growth_mb']} MB)\n          {stages}"
+            )
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Synthetic templates for benchmarking the generation pipeline."""
+import io
+import random
+import struct
+import zlib
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+
+def make_png(width: int, height: int, seed: int = 0) -> bytes:
+    """
+    Build an RGB PNG of the given size.
+    The pixel data is noise, so it barely compresses and the blob stays big.
+    """
+    rng = random.Random(seed)
+    row_bytes = width * 3
+    raw = b"".join(b"\x00" + rng.randbytes(row_bytes) for _ in range(height))
+
+    def chunk(tag, data):
+        return (
+            struct.pack(">I", len(data)) + tag + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def make_template(slide_count: int = 3, shapes_per_slide: int = 2, image_size=(400, 300), image_count: int = 1) -> bytes:
+    """
+    Build a template .pptx in memory.
+    Every slide uses "Title and Content" and carries image_count pictures plus
+    shapes_per_slide decorative text boxes, so the content-slide finder and
+    the shape copier both have work to do.
+    """
+    prs = Presentation()
+    layout = prs.slide_layouts[1]
+    images = [make_png(image_size[0], image_size[1], seed=i) for i in range(image_count)]
+
+    for slide_index in range(max(1, slide_count)):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"Template slide {slide_index + 1}"
+        for image_index, blob in enumerate(images):
+            slide.shapes.add_picture(
+                io.BytesIO(blob),
+                Inches(8 - image_index * 0.3), Inches(0.2),
+                Inches(1.5), Inches(1),
+            )
+        for shape_index in range(shapes_per_slide):
+            box = slide.shapes.add_textbox(
+                Inches(0.5), Inches(6.5 - 0.1 * shape_index),
+                Inches(4), Inches(0.4),
+            )
+            box.text = f"Footer {shape_index}"
+            box.text_frame.paragraphs[0].font.size = Pt(10)
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def make_slide_data(slide_count: int, points_per_slide: int = 4):
+    """Deterministic slide_data in the shape generate_slide_content returns."""
+    return [
+        {
+            "title": f"Section {i + 1}",
+            "points": [f"Point {j + 1} of section {i + 1}" for j in range(points_per_slide)],
+        }
+        for i in range(slide_count)
+    ]
+
+
+# Template complexity profiles used by the benchmark runner
+PROFILES = {
+    "simple": {"slide_count": 1, "shapes_per_slide": 0, "image_size": (200, 100), "image_count": 1},
+    "medium": {"slide_count": 5, "shapes_per_slide": 4, "image_size": (800, 600), "image_count": 1},
+    "complex": {"slide_count": 20, "shapes_per_slide": 12, "image_size": (2000, 1500), "image_count": 2},
+}
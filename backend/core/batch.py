@@ -0,0 +1,125 @@
+import asyncio
+import json
+import re
+import time
+import traceback
+import zipfile
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+_UNSAFE_NAME_RE = re.compile(r"[^\w.-]+")
+MAX_NAME_CHARS = 120
+
+
+def safe_filename(raw: str, default: str = "presentation") -> str:
+    """Path-safe .pptx name for a client-supplied file name."""
+    stem = _UNSAFE_NAME_RE.sub("_", raw.strip()).strip("._")[:MAX_NAME_CHARS]
+    if stem.lower().endswith(".pptx"):
+        stem = stem[:-len(".pptx")].rstrip("._")
+    return f"{stem or default}.pptx"
+
+
+def safe_document_names(names: List[str], count: int) -> List[str]:
+    """Unique, path-safe .pptx names for each document in a batch."""
+    result = []
+    seen = set()
+    for i in range(count):
+        raw = names[i] if i < len(names) else ""
+        name = safe_filename(raw, f"document_{i + 1}")
+        stem = name[:-len(".pptx")]
+        suffix = 2
+        while name.lower() in seen:
+            name = f"{stem}_{suffix}.pptx"
+            suffix += 1
+        seen.add(name.lower())
+        result.append(name)
+    return result
+
+
+async def render_batch(
+    count: int,
+    render: Callable[[int], Awaitable[bytes]],
+    names: List[str],
+    concurrency: int,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run render(index) for every document with at most concurrency in flight
+    and yield one result item per document, in completion order.
+    A failing document produces a "failed" item instead of aborting the batch.
+    """
+    gate = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int) -> Dict[str, Any]:
+        item = {"index": index, "name": names[index], "status": "succeeded", "error": None, "result": None}
+        async with gate:
+            start = time.perf_counter()
+            try:
+                item["result"] = await render(index)
+            except Exception as e:
+                print(f"=== Exception in batch document {index} ===")
+                traceback.print_exc()
+                item["status"] = "failed"
+                item["error"] = str(e)
+            item["seconds"] = round(time.perf_counter() - start, 3)
+        return item
+
+    tasks = [asyncio.ensure_future(run(i)) for i in range(count)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def manifest_entry(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-document manifest record (everything except the deck bytes)."""
+    entry = {key: value for key, value in item.items() if key != "result"}
+    if item["result"] is not None:
+        entry["size"] = len(item["result"])
+    return entry
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that hands written bytes back out."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(items: AsyncIterator[Dict[str, Any]], count: int) -> AsyncIterator[bytes]:
+    """
+    Stream a zip of finished decks as they complete, followed by
+    manifest.json describing every document (including failures).
+    Decks are already compressed, so entries are stored as-is.
+    """
+    sink = _ChunkSink()
+    manifest = [None] * count
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        async for item in items:
+            manifest[item["index"]] = manifest_entry(item)
+            if item["result"] is not None:
+                archive.writestr(item["name"], item["result"])
+                yield sink.drain()
+        archive.writestr(
+            "manifest.json",
+            json.dumps({"documents": manifest}, indent=2),
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
+    yield sink.drain()
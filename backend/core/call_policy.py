@@ -0,0 +1,279 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.clients import ENABLED_PROVIDERS
+from core.config import env_float, env_int, env_str
+
+# HTTP statuses worth another attempt (529 is Anthropic's "overloaded")
+RETRYABLE_STATUSES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+# SDK exception class names for network failures that carry no status code
+_CONNECTION_ERRORS = frozenset({
+    "APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout",
+    "RemoteProtocolError", "ServiceUnavailable", "DeadlineExceeded",
+})
+
+# Environment variables holding server-side keys, used only for failover
+PROVIDER_KEY_VARS = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "gemini": "GEMINI_API_KEY",
+}
+
+Attempt = Callable[[str, str], Awaitable]
+Slot = Optional[Callable[[str, str], AsyncContextManager]]
+
+
+@asynccontextmanager
+async def _unbounded(provider: str, api_key: str):
+    yield
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status of an SDK error (openai/anthropic status_code, google api_core code)."""
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return int(value)
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    status = status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return type(exc).__name__ in _CONNECTION_ERRORS
+
+
+def describe(exc: BaseException) -> str:
+    return str(exc) or type(exc).__name__
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait (retry-after-ms / Retry-After), if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per provider, for hedging."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+
+    def observe(self, provider: str, seconds: float):
+        samples = self._samples.get(provider)
+        if samples is None:
+            samples = self._samples[provider] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def quantile(self, provider: str, q: float) -> Optional[float]:
+        samples = self._samples.get(provider)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CallPolicy:
+    """
+    Timeouts, retries, hedging and failover around one LLM request.
+
+    Every attempt gets its own deadline. Retryable failures (timeouts,
+    connection errors, 429 and 5xx) are retried with full-jitter exponential
+    backoff, waiting at least as long as the provider's Retry-After. With
+    hedging on, a second attempt is started once the first runs past the
+    provider's p95 latency, and whichever finishes first wins. When a
+    provider's attempts are exhausted by retryable failures, failover
+    providers with a server-side key in the environment are tried in order;
+    anything else (a rejected key, a bad request) is raised as is.
+    """
+
+    def __init__(
+        self,
+        attempt_timeout: float = 60.0,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        deadline: float = 180.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 2.0,
+        hedge_provider: str = "",
+        failover: Tuple[str, ...] = (),
+    ):
+        self.attempt_timeout = attempt_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_provider = hedge_provider
+        self.failover = failover
+        self.latency = LatencyTracker()
+
+    async def iterate(self, stream):
+        """Yield from an async iterator, failing if any chunk takes longer than attempt_timeout."""
+        iterator = stream.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), self.attempt_timeout)
+            except StopAsyncIteration:
+                return
+            yield chunk
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        """Delay before retry number attempt (1-based)."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        requested = retry_after(exc)
+        return max(delay, requested) if requested is not None else delay
+
+    def hedge_delay(self, provider: str) -> float:
+        observed = self.latency.quantile(provider, self.hedge_quantile)
+        return max(self.hedge_min_delay, observed) if observed is not None else max(self.hedge_min_delay, self.attempt_timeout / 2)
+
+    def failover_targets(self, provider: str) -> List[Tuple[str, str]]:
+        """(provider, key) pairs to try after provider, skipping ones without a configured key."""
+        targets = []
+        for name in self.failover:
+            key = env_str(PROVIDER_KEY_VARS.get(name, ""))
+            if name != provider and name in ENABLED_PROVIDERS and key:
+                targets.append((name, key))
+        return targets
+
+    async def run(self, provider: str, api_key: str, attempt: Attempt, slot: Slot = None) -> Tuple[object, str]:
+        """
+        Run attempt(provider, api_key) under the policy.
+        Each attempt runs inside slot(provider, api_key), an async context
+        manager entered before the attempt's deadline starts, so time spent
+        queueing for a rate limit or concurrency slot is neither a timeout
+        nor a reason to hedge.
+        Returns (result, provider that produced it); raises the last error if
+        every provider failed.
+        """
+        deadline = time.monotonic() + self.deadline
+        targets = [(provider, api_key)] + self.failover_targets(provider)
+        error: Optional[BaseException] = None
+        for index, (name, key) in enumerate(targets):
+            try:
+                return await self._with_retries(name, key, attempt, slot or _unbounded, deadline)
+            except Exception as e:
+                # Only provider trouble fails over; a bad user key must not be served on ours
+                if not is_retryable(e) or time.monotonic() >= deadline:
+                    raise
+                error = e
+                if index + 1 < len(targets):
+                    print(f"{name} failed ({describe(e)}); failing over to {targets[index + 1][0]}")
+        raise error
+
+    async def _with_retries(self, provider: str, api_key: str, attempt: Attempt, slot: Slot, deadline: float):
+        for number in range(1, self.max_attempts + 1):
+            try:
+                return await self._hedged(provider, api_key, attempt, slot, deadline)
+            except Exception as e:
+                if number == self.max_attempts or not is_retryable(e):
+                    raise
+                delay = self.backoff(number, e)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                print(f"{provider} attempt {number} failed ({describe(e)}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _timed(self, provider: str, api_key: str, attempt: Attempt, slot: Slot, deadline: float,
+                     started: Optional[asyncio.Event] = None):
+        async with slot(provider, api_key):
+            timeout = min(self.attempt_timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise asyncio.TimeoutError(f"{provider} call deadline exceeded")
+            if started is not None:
+                started.set()
+            start = time.monotonic()
+            result = await asyncio.wait_for(attempt(provider, api_key), timeout)
+        self.latency.observe(provider, time.monotonic() - start)
+        return result, provider
+
+    async def _hedged(self, provider: str, api_key: str, attempt: Attempt, slot: Slot, deadline: float):
+        if not self.hedge:
+            return await self._timed(provider, api_key, attempt, slot, deadline)
+
+        started = asyncio.Event()
+        primary = asyncio.ensure_future(self._timed(provider, api_key, attempt, slot, deadline, started))
+        tasks = [primary]
+        try:
+            # The hedge delay counts from when the primary actually starts, not while it queues
+            waiter = asyncio.ensure_future(started.wait())
+            try:
+                await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=self.hedge_delay(provider))
+            if primary.done():
+                return primary.result()
+
+            hedge_provider, hedge_key = provider, api_key
+            if self.hedge_provider and self.hedge_provider != provider and self.hedge_provider in ENABLED_PROVIDERS:
+                hedge_key = env_str(PROVIDER_KEY_VARS.get(self.hedge_provider, ""))
+                if hedge_key:
+                    hedge_provider = self.hedge_provider
+                else:
+                    hedge_key = api_key
+            print(f"{provider} call passed its hedge delay; hedging with {hedge_provider}")
+            tasks.append(asyncio.ensure_future(self._timed(hedge_provider, hedge_key, attempt, slot, deadline)))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+
+call_policy = CallPolicy(
+    attempt_timeout=env_float("LLM_ATTEMPT_TIMEOUT", 60.0),
+    max_attempts=env_int("LLM_MAX_ATTEMPTS", 3),
+    backoff_base=env_float("LLM_BACKOFF_BASE", 0.5),
+    backoff_max=env_float("LLM_BACKOFF_MAX", 20.0),
+    deadline=env_float("LLM_CALL_DEADLINE", 180.0),
+    hedge=env_int("LLM_HEDGE", 0) > 0,
+    hedge_quantile=env_float("LLM_HEDGE_QUANTILE", 0.95),
+    hedge_min_delay=env_float("LLM_HEDGE_MIN_DELAY", 2.0),
+    hedge_provider=env_str("LLM_HEDGE_PROVIDER").lower(),
+    failover=tuple(name.strip().lower() for name in env_str("LLM_FAILOVER_PROVIDERS").split(",") if name.strip()),
+)
@@ -0,0 +1,119 @@
+import re
+from typing import Dict, List
+
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_NON_WORD_RE = re.compile(r"\W+")
+
+MAX_POINTS_PER_SLIDE = 6
+
+
+def split_into_sections(text: str, max_chars: int) -> List[str]:
+    """
+    Split a long document into chunks of at most ~max_chars.
+    Markdown headings and blank lines are preferred cut points; an oversized
+    block is cut at sentence ends, and as a last resort at max_chars.
+    Runs in a single pass over the text.
+    """
+    blocks = []
+    current = []
+    for line in text.splitlines():
+        if _HEADING_RE.match(line) and current:
+            blocks.append("\n".join(current))
+            current = []
+        if not line.strip():
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+
+    pieces = []
+    for block in blocks:
+        if len(block) <= max_chars:
+            pieces.append(block)
+        else:
+            pieces.extend(_split_oversized(block, max_chars))
+
+    # Pack consecutive pieces into chunks, starting a new chunk at headings
+    # once the current one is at least half full
+    sections = []
+    current_parts = []
+    current_len = 0
+    for piece in pieces:
+        starts_section = bool(_HEADING_RE.match(piece))
+        too_long = current_len + len(piece) + 2 > max_chars
+        if current_parts and (too_long or (starts_section and current_len >= max_chars // 2)):
+            sections.append("\n\n".join(current_parts))
+            current_parts = []
+            current_len = 0
+        current_parts.append(piece)
+        current_len += len(piece) + 2
+    if current_parts:
+        sections.append("\n\n".join(current_parts))
+    return sections
+
+
+def _split_oversized(block: str, max_chars: int) -> List[str]:
+    pieces = []
+    current = ""
+    for sentence in _SENTENCE_END_RE.split(block):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD_RE.sub(" ", str(text).lower()).strip()
+
+
+def merge_slide_lists(slide_lists: List[List[Dict]]) -> List[Dict]:
+    """
+    Merge per-chunk slide lists into one ordered deck.
+    A slide whose title matches the slide right before it (typically a topic
+    cut by a chunk boundary) is folded into it, duplicate points dropped;
+    the same title further away is a separate slide and keeps its place.
+    Points beyond MAX_POINTS_PER_SLIDE spill into a "(cont.)" slide right
+    after the original.
+    """
+    merged = []
+    previous_key = ""
+    for slides in slide_lists:
+        for slide in slides:
+            title = slide.get("title") or ""
+            points = list(slide.get("points") or [])
+            key = _normalize(title)
+            if not key or key != previous_key:
+                merged.append({"title": title, "points": [], "_seen": set()})
+            previous_key = key
+            existing = merged[-1]
+            for point in points:
+                point_key = _normalize(point)
+                if point_key in existing["_seen"]:
+                    continue
+                existing["_seen"].add(point_key)
+                existing["points"].append(point)
+
+    deck = []
+    for entry in merged:
+        points = entry["points"]
+        deck.append({"title": entry["title"], "points": points[:MAX_POINTS_PER_SLIDE]})
+        for start in range(MAX_POINTS_PER_SLIDE, len(points), MAX_POINTS_PER_SLIDE):
+            deck.append({
+                "title": f"{entry['title']} (cont.)",
+                "points": points[start:start + MAX_POINTS_PER_SLIDE],
+            })
+    return deck
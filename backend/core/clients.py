@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import importlib
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Tuple
+
+from core.config import env_float, env_int, env_str
+from core.rate_limit import rate_limits
+
+PROVIDERS = ("openai", "anthropic", "gemini")
+
+# SDK modules per provider. They are imported on first use (or during start-up
+# warm-up), never at module import, so unused SDKs cost nothing.
+PROVIDER_MODULES = {
+    "openai": ("openai",),
+    "anthropic": ("anthropic",),
+    "gemini": ("google.generativeai", "google.generativeai.client"),
+}
+
+
+def _enabled_providers():
+    names = [name.strip().lower() for name in env_str("ENABLED_PROVIDERS").split(",") if name.strip()]
+    for name in names:
+        if name not in PROVIDERS:
+            print(f"Ignoring unknown provider in ENABLED_PROVIDERS: {name!r}")
+    return tuple(name for name in names if name in PROVIDERS) or PROVIDERS
+
+
+# Providers this deployment serves; the SDKs of the others are never imported
+ENABLED_PROVIDERS = _enabled_providers()
+
+
+def import_provider(provider: str):
+    """Import a provider's SDK modules, refusing providers that are not enabled."""
+    if provider not in ENABLED_PROVIDERS:
+        raise ValueError(f"LLM provider is not enabled: {provider}")
+    for module in PROVIDER_MODULES[provider]:
+        importlib.import_module(module)
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Stable, non-reversible identifier for an API key (never store the key itself)."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class _GeminiClient:
+    """
+    Per-key Gemini client.
+    genai.configure() is process-global, so each key gets its own client manager
+    and the async transport is injected into the models we hand out.
+    """
+
+    def __init__(self, api_key: str):
+        from google.generativeai.client import _ClientManager
+
+        manager = _ClientManager()
+        manager.configure(api_key=api_key)
+        self._async_client = manager.make_client("generative_async")
+
+    def model(self, model_name: str, **kwargs):
+        import google.generativeai as genai
+
+        model = genai.GenerativeModel(model_name, **kwargs)
+        # GenerativeModel would otherwise lazily pick the global default client.
+        model._async_client = self._async_client
+        return model
+
+    async def close(self):
+        await self._async_client.transport.close()
+
+
+def _rate_limit_hooks(provider: str, api_key: str):
+    """httpx event hooks that feed every response's rate-limit headers to the limiter."""
+    fingerprint = key_fingerprint(api_key)
+
+    async def observe(response):
+        rate_limits.observe(provider, fingerprint, response.status_code, response.headers)
+
+    return {"response": [observe]}
+
+
+def _build_client(provider: str, api_key: str):
+    """Construct a fresh async SDK client for a provider."""
+    if provider in PROVIDER_MODULES:
+        import_provider(provider)
+    if provider == "openai":
+        import openai
+        # Retries and timeouts are owned by core.call_policy
+        return openai.AsyncOpenAI(
+            api_key=api_key,
+            max_retries=0,
+            http_client=openai.DefaultAsyncHttpxClient(event_hooks=_rate_limit_hooks(provider, api_key)),
+        )
+    if provider == "anthropic":
+        import anthropic
+        return anthropic.AsyncAnthropic(
+            api_key=api_key,
+            max_retries=0,
+            http_client=anthropic.DefaultAsyncHttpxClient(event_hooks=_rate_limit_hooks(provider, api_key)),
+        )
+    if provider == "gemini":
+        return _GeminiClient(api_key)
+    raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+class ClientRegistry:
+    """
+    Keeps warm SDK clients (and their keep-alive HTTP pools) keyed by
+    provider and API-key hash, with LRU size bound and idle eviction.
+    Evicted clients are closed once no request is using them any more.
+    """
+
+    def __init__(self, max_size: int = 256, idle_ttl: float = 600.0):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        # key -> {"client", "last_used", "in_use", "evicted"}
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @asynccontextmanager
+    async def lease(self, provider: str, api_key: str):
+        """Borrow the pooled client for (provider, api_key) for one call."""
+        entry = self._acquire(provider, api_key)
+        try:
+            yield entry["client"]
+        finally:
+            entry["in_use"] -= 1
+            entry["last_used"] = time.monotonic()
+            if entry["evicted"] and entry["in_use"] == 0:
+                await _close_client(entry["client"])
+
+    def _acquire(self, provider: str, api_key: str) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        key = (provider, key_fingerprint(api_key))
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {
+                "client": _build_client(provider, api_key),
+                "last_used": now,
+                "in_use": 0,
+                "evicted": False,
+            }
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                _, oldest = self._entries.popitem(last=False)
+                self._retire(oldest)
+        else:
+            self._entries.move_to_end(key)
+
+        entry["in_use"] += 1
+        entry["last_used"] = now
+        return entry
+
+    def _evict_idle(self, now: float):
+        stale = [
+            key for key, entry in self._entries.items()
+            if entry["in_use"] == 0 and now - entry["last_used"] > self.idle_ttl
+        ]
+        for key in stale:
+            self._retire(self._entries.pop(key))
+
+    def _retire(self, entry: Dict[str, Any]):
+        entry["evicted"] = True
+        if entry["in_use"] == 0:
+            _schedule_close(entry["client"])
+
+    async def aclose(self):
+        """Close every pooled client (used on shutdown)."""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            entry["evicted"] = True
+            if entry["in_use"] == 0:
+                await _close_client(entry["client"])
+
+
+async def _close_client(client):
+    try:
+        await client.close()
+    except Exception as e:
+        print(f"Error closing LLM client: {e}")
+
+
+def _schedule_close(client):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.create_task(_close_client(client))
+
+
+client_registry = ClientRegistry(
+    max_size=env_int("LLM_CLIENT_POOL_SIZE", 256),
+    idle_ttl=env_float("LLM_CLIENT_IDLE_TTL", 600.0),
+)
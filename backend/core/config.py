@@ -0,0 +1,30 @@
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to default."""
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring invalid integer for {name}: {value!r}")
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to default."""
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Ignoring invalid number for {name}: {value!r}")
+        return default
+
+
+def env_str(name: str, default: str = "") -> str:
+    """Read a string setting from the environment."""
+    return os.environ.get(name, default).strip()
@@ -1,57 +1,292 @@
-
 from pptx import Presentation
 from pptx.enum.shapes import PP_PLACEHOLDER, MSO_SHAPE_TYPE
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_PARAGRAPH_ALIGNMENT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from lxml import etree
 import os
 import io
+import hashlib
 from typing import Optional, Dict, Any, List
 
-def create_ppt_from_template(slide_data, output_path, template_path=None, template_style=None):
+from core.metrics import span
+from core.template_cache import template_cache
+
+# Font for code points (e.g. fenced code blocks from markdown input)
+CODE_FONT = "Courier New"
+CODE_FONT_SIZE = Pt(14)
+
+def create_ppt_from_template(slide_data, output_path, template_path=None, template_style=None, template_analysis=None):
     """
     Creates a NEW PPT file by DUPLICATING template slides and replacing content.
     This preserves ALL visual elements including backgrounds, shapes, and images.
+    The template is analyzed once per distinct file content and cached, so
+    repeat uploads of the same template skip parsing and slide scanning.
+    output_path may be a filesystem path or a writable binary file object.
     """
     
-    if not template_path or not os.path.exists(template_path):
-        # No template - create basic presentation
-        return create_basic_presentation(slide_data, output_path)
+    if template_analysis is None:
+        if not template_path or not os.path.exists(template_path):
+            # No template - create basic presentation
+            return create_basic_presentation(slide_data, output_path)
     
     try:
-        # Load template
-        template_prs = Presentation(template_path)
-        
-        # Find the best template slide to use as a base
-        template_slide = find_best_content_slide(template_prs)
-        template_slide_layout = template_slide.slide_layout if template_slide else template_prs.slide_layouts[1]
+        if template_analysis is None:
+            with open(template_path, "rb") as f:
+                template_analysis = get_template_analysis(f.read())
         
-        # Create new presentation using the same template
-        new_prs = Presentation(template_path)
-        
-        # Remove all existing slides (keep just the master/layouts)
-        slide_indices = list(range(len(new_prs.slides)))
-        for i in reversed(slide_indices):
-            rId = new_prs.slides._sldIdLst[i].rId
-            new_prs.part.drop_rel(rId)
-            del new_prs.slides._sldIdLst[i]
+        # Stamp out a new presentation from the prepared slide-less master
+        builder = DeckBuilder(template_analysis)
         
         # Create new slides by duplicating the template slide structure
         for slide_content in slide_data:
-            new_slide = duplicate_slide_with_content(
-                new_prs, 
-                template_slide_layout, 
-                template_slide,
-                slide_content
-            )
+            builder.add_slide(slide_content)
         
-        new_prs.save(output_path)
-        return output_path
+        return builder.save(output_path)
         
     except Exception as e:
         print(f"Error with template processing: {e}")
-        # Fallback to basic presentation
+        # Fallback to basic presentation (discarding any partial output)
+        if hasattr(output_path, "truncate"):
+            output_path.seek(0)
+            output_path.truncate()
         return create_basic_presentation(slide_data, output_path)
 
+class DeckBuilder:
+    """
+    Incremental renderer: opens the template once, adds slides one at a time
+    (e.g. as they stream in from the LLM), then saves.
+    Without a template analysis it builds the basic default-theme deck.
+    """
+    
+    def __init__(self, template_analysis=None):
+        self.template_analysis = template_analysis
+        with span("deck_open"):
+            if template_analysis is None:
+                self.prs = Presentation()
+                self.layout = _default_layout(self.prs)
+                self.template_analysis = {"stamp": basic_stamp(), "images": {}}
+            else:
+                self.prs = Presentation(io.BytesIO(template_analysis["master_bytes"]))
+                master_index, layout_index = template_analysis["layout"]
+                self.layout = self.prs.slide_masters[master_index].slide_layouts[layout_index]
+        # Image parts are added to the package once and shared by every slide
+        self.shared_parts = {}
+        self.slide_count = 0
+    
+    def add_slide(self, content):
+        slide = duplicate_slide_with_content(
+            self.prs,
+            self.layout,
+            self.template_analysis,
+            content,
+            self.shared_parts
+        )
+        self.slide_count += 1
+        return slide
+    
+    def save(self, output_path):
+        with span("save"):
+            self.prs.save(output_path)
+        return output_path
+
+def template_digest(template_bytes: bytes) -> str:
+    """Content address of a template: SHA-256 of its bytes."""
+    return hashlib.sha256(template_bytes).hexdigest()
+
+def get_template_analysis(template_bytes: bytes, digest: Optional[str] = None) -> Dict[str, Any]:
+    """Return the cached analysis for these template bytes, analyzing on a miss."""
+    digest = digest or template_digest(template_bytes)
+    
+    def analyze():
+        with span("template_load"):
+            return analyze_template(template_bytes, digest)
+    
+    return template_cache.get_or_create(digest, analyze)
+
+def analyze_template(template_bytes: bytes, digest: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse a template once and capture everything needed to render from it:
+    the layout to use, the best content slide, the non-placeholder shapes to
+    copy, their image blobs, and an "empty master" package (the template with
+    every slide removed). The result holds only plain data.
+    """
+    template_prs = Presentation(io.BytesIO(template_bytes))
+    
+    # Find the best template slide to use as a base
+    with span("slide_find"):
+        template_slide = find_best_content_slide(template_prs)
+    if template_slide:
+        template_slide_layout = template_slide.slide_layout
+    else:
+        template_slide_layout = _default_layout(template_prs)
+    
+    analysis = {
+        "digest": digest or template_digest(template_bytes),
+        "layout": _layout_position(template_prs, template_slide_layout),
+        "slide_index": template_prs.slides.index(template_slide) if template_slide else None,
+        "shapes": [],
+        "images": {},
+    }
+    
+    if template_slide:
+        # Identify all non-placeholder shapes in template
+        for shape in template_slide.shapes:
+            if not shape.is_placeholder:
+                spec = describe_shape(shape, analysis["images"])
+                if spec:
+                    analysis["shapes"].append(spec)
+    
+    analysis["master_bytes"] = build_empty_master(template_prs)
+    
+    # Compile against a fresh copy of the master; its scratch slide is discarded
+    stamp_prs = Presentation(io.BytesIO(analysis["master_bytes"]))
+    master_index, layout_index = analysis["layout"]
+    stamp_layout = stamp_prs.slide_masters[master_index].slide_layouts[layout_index]
+    analysis["stamp"] = compile_stamp(stamp_prs, stamp_layout, analysis)
+    analysis["size"] = (
+        len(analysis["master_bytes"])
+        + len(analysis["stamp"]["xml"])
+        + sum(len(blob) for blob in analysis["images"].values())
+    )
+    return analysis
+
+def compile_stamp(prs, layout, template_analysis=None) -> Dict[str, Any]:
+    """
+    Compile the slide a layout produces into a reusable "stamp" plan.
+    A scratch slide is added once, the template's visual elements are copied
+    onto it, and all of its shapes (cloned layout placeholders included) are
+    serialized as a single spTree fragment. Each generated slide then costs
+    one XML parse and append instead of cloning placeholders and rebuilding
+    every shape. Image references are the only per-slide part: "pictures"
+    lists (position in fragment, image SHA-1) pairs whose r:embed is
+    re-pointed at the deck's shared image part. "title" and "body" are the
+    fragment positions of the title and body placeholders, so filling them
+    needs no shape scan.
+    """
+    scratch = prs.slides.add_slide(layout)
+    if template_analysis and template_analysis["shapes"]:
+        copy_template_visual_elements(template_analysis, scratch, {})
+    
+    sp_tree = scratch.shapes._spTree
+    stamp = {"xml": None, "pictures": [], "title": None, "body": None}
+    fragment = etree.Element(qn("p:spTree"), nsmap=sp_tree.nsmap)
+    for element in list(sp_tree.iter_shape_elms()):
+        position = len(fragment)
+        if element.ph is not None:
+            if element.ph_type == PP_PLACEHOLDER.TITLE:
+                stamp["title"] = position
+            elif element.ph_type in (PP_PLACEHOLDER.BODY, PP_PLACEHOLDER.OBJECT):
+                stamp["body"] = position
+        for blip in element.xpath(".//a:blip[@r:embed]"):
+            image_part = scratch.part.related_part(blip.get(qn("r:embed")))
+            stamp["pictures"].append((position, image_part.sha1))
+        fragment.append(element)
+    
+    stamp["xml"] = etree.tostring(fragment)
+    return stamp
+
+_basic_stamp = None
+
+def basic_stamp() -> Dict[str, Any]:
+    """Stamp plan for the default-theme deck, compiled once per process."""
+    global _basic_stamp
+    if _basic_stamp is None:
+        prs = Presentation()
+        _basic_stamp = compile_stamp(prs, _default_layout(prs))
+    return _basic_stamp
+
+def build_empty_master(prs) -> bytes:
+    """
+    Serialize prs with all slides removed (keep just the master/layouts).
+    Only parts still reachable through relationships are written, so the
+    dropped slides and their media do not end up in the package.
+    """
+    slide_indices = list(range(len(prs.slides)))
+    for i in reversed(slide_indices):
+        rId = prs.slides._sldIdLst[i].rId
+        prs.part.drop_rel(rId)
+        del prs.slides._sldIdLst[i]
+    
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+def _default_layout(prs):
+    """The "Title and Content" layout of the default theme (or the only layout)."""
+    layouts = prs.slide_layouts
+    return layouts[1] if len(layouts) > 1 else layouts[0]
+
+def _layout_position(prs, layout):
+    """(master index, layout index) of a layout, stable across reloads of the file."""
+    for master_index, master in enumerate(prs.slide_masters):
+        for layout_index, candidate in enumerate(master.slide_layouts):
+            if candidate == layout:
+                return (master_index, layout_index)
+    return (0, 0)
+
+def describe_shape(shape, images):
+    """
+    Capture a non-placeholder shape as plain data for later copying.
+    Image blobs are stored once in images, keyed by SHA-1.
+    """
+    try:
+        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+            image = shape.image
+            images.setdefault(image.sha1, image.blob)
+            return {
+                "kind": "picture",
+                "left": shape.left, "top": shape.top,
+                "width": shape.width, "height": shape.height,
+                "rotation": shape.rotation,
+                "image": image.sha1,
+                "xml": _portable_picture_xml(shape),
+            }
+        
+        if shape.shape_type in (MSO_SHAPE_TYPE.TEXT_BOX, MSO_SHAPE_TYPE.AUTO_SHAPE) and shape.has_text_frame:
+            return {
+                "kind": "text",
+                "left": shape.left, "top": shape.top,
+                "width": shape.width, "height": shape.height,
+                "text": shape.text_frame.text,
+                "paragraphs": [
+                    {
+                        "alignment": para.alignment,
+                        "font_name": para.font.name,
+                        "font_size": para.font.size,
+                    }
+                    for para in shape.text_frame.paragraphs
+                ],
+            }
+        
+        # Other shape types are not copied yet
+        return {"kind": "other", "shape_type": shape.shape_type}
+    
+    except Exception as e:
+        print(f"Error analyzing shape: {e}")
+        return None
+
+def _portable_picture_xml(shape):
+    """
+    Serialized <p:pic> XML that can be re-linked on another slide, or None.
+    Only pictures whose sole relationship is the main image blip qualify;
+    anything else (hyperlinks, linked or SVG images) is copied the slow way.
+    """
+    element = shape._element
+    r_namespace = qn("r:embed")[:-len("embed")]
+    r_attrs = [
+        (node, name)
+        for node in element.iter()
+        for name in node.attrib
+        if name.startswith(r_namespace)
+    ]
+    blips = element.xpath("./p:blipFill/a:blip")
+    if len(r_attrs) != 1 or not blips or r_attrs[0] != (blips[0], qn("r:embed")):
+        return None
+    return etree.tostring(element)
+
 def find_best_content_slide(template_prs):
     """
     Find the best slide from template to use as a base for content slides.
@@ -84,119 +319,156 @@ def find_best_content_slide(template_prs):
     
     return best_slide
 
-def duplicate_slide_with_content(new_prs, layout, template_slide, content):
+def duplicate_slide_with_content(new_prs, layout, template_analysis, content, shared_parts=None):
     """
-    Create a new slide by copying template slide structure and replacing content.
+    Create a new slide from the template's compiled stamp plan and replace content.
     This preserves ALL visual elements while updating text content.
     """
-    # Add new slide using the same layout
-    new_slide = new_prs.slides.add_slide(layout)
+    stamp = template_analysis["stamp"]
     
-    if template_slide:
-        # Copy ALL non-placeholder shapes from template slide
-        copy_template_visual_elements(template_slide, new_slide)
+    # Add a blank slide on the same layout and stamp every shape onto it at once
+    with span("stamp"):
+        new_slide, elements = stamp_slide(
+            new_prs,
+            layout,
+            stamp,
+            template_analysis["images"],
+            shared_parts if shared_parts is not None else {}
+        )
     
     # Now populate the placeholders with our content
-    populate_slide_content(new_slide, content)
+    with span("populate"):
+        title_shape = new_slide.shapes._shape_factory(elements[stamp["title"]]) if stamp["title"] is not None else None
+        content_shape = new_slide.shapes._shape_factory(elements[stamp["body"]]) if stamp["body"] is not None else None
+        populate_slide_content(new_slide, title_shape, content_shape, content)
     
     return new_slide
 
-def copy_template_visual_elements(template_slide, new_slide):
+def stamp_slide(prs, layout, stamp, images, shared_parts):
+    """
+    Add a slide on layout holding the stamp's shapes, re-linking its pictures.
+    Returns the slide and the appended shape elements, in stamp order.
+    """
+    rId, slide = prs.part.add_slide(layout)
+    prs.slides._sldIdLst.add_sldId(rId)
+    
+    elements = list(parse_xml(stamp["xml"]))
+    for position, image_sha1 in stamp["pictures"]:
+        image_rId = _shared_image_rId(slide, image_sha1, images, shared_parts)
+        for blip in elements[position].xpath(".//a:blip[@r:embed]"):
+            blip.set(qn("r:embed"), image_rId)
+    
+    slide.shapes._spTree.extend(elements)
+    return slide, elements
+
+def _shared_image_rId(slide, image_sha1, images, shared_parts):
+    """Relate slide to the presentation-wide image part for image_sha1, adding it once."""
+    image_part = shared_parts.get(image_sha1)
+    if image_part is None:
+        image_part, _ = slide.part.get_or_add_image_part(io.BytesIO(images[image_sha1]))
+        shared_parts[image_sha1] = image_part
+    return slide.part.relate_to(image_part, RT.IMAGE)
+
+def copy_template_visual_elements(template_analysis, new_slide, shared_parts=None):
     """
     Copy all visual elements (non-placeholder shapes) from template to new slide.
     This includes backgrounds, decorative shapes, images, logos, etc.
     """
     try:
-        shapes_to_copy = []
-        
-        # Identify all non-placeholder shapes in template
-        for shape in template_slide.shapes:
-            if not shape.is_placeholder:
-                shapes_to_copy.append(shape)
-        
         # Copy each non-placeholder shape
-        for shape in shapes_to_copy:
-            copy_shape_to_slide(shape, new_slide)
+        for spec in template_analysis["shapes"]:
+            copy_shape_to_slide(spec, new_slide, template_analysis["images"], shared_parts)
             
     except Exception as e:
         print(f"Error copying visual elements: {e}")
 
-def copy_shape_to_slide(source_shape, target_slide):
+def copy_shape_to_slide(spec, target_slide, images, shared_parts=None):
     """
     Copy a specific shape from source to target slide.
     Handles different shape types (images, text boxes, shapes, etc.)
     """
     try:
         # Handle images
-        if source_shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-            copy_image_shape(source_shape, target_slide)
+        if spec["kind"] == "picture":
+            copy_image_shape(spec, target_slide, images, shared_parts)
         
         # Handle text boxes and auto shapes
-        elif source_shape.shape_type in (MSO_SHAPE_TYPE.TEXT_BOX, MSO_SHAPE_TYPE.AUTO_SHAPE):
-            copy_text_or_shape(source_shape, target_slide)
+        elif spec["kind"] == "text":
+            copy_text_or_shape(spec, target_slide)
             
         # Handle other shape types
         else:
             try:
                 # Generic shape copying (best effort)
-                copy_generic_shape(source_shape, target_slide)
+                copy_generic_shape(spec, target_slide)
             except:
-                print(f"Could not copy shape type: {source_shape.shape_type}")
+                print(f"Could not copy shape type: {spec.get('shape_type')}")
                 
     except Exception as e:
         print(f"Error copying individual shape: {e}")
 
-def copy_image_shape(source_shape, target_slide):
-    """Copy an image shape to the target slide."""
+def copy_image_shape(spec, target_slide, images, shared_parts=None):
+    """
+    Copy an image shape to the target slide.
+    When shared_parts is given, the picture XML is cloned and pointed at one
+    image part per presentation, so the blob is not re-read or re-hashed.
+    """
     try:
+        if spec.get("xml") and shared_parts is not None:
+            link_shared_picture(spec, target_slide, images, shared_parts)
+            return
+        
         # Get image data
-        image_data = source_shape.image.blob
+        image_data = images[spec["image"]]
         image_stream = io.BytesIO(image_data)
         
         # Add image to target slide with same position and size
         pic = target_slide.shapes.add_picture(
             image_stream,
-            source_shape.left,
-            source_shape.top,
-            source_shape.width,
-            source_shape.height
+            spec["left"],
+            spec["top"],
+            spec["width"],
+            spec["height"]
         )
         
         # Copy any formatting properties if possible
-        if hasattr(source_shape, 'rotation'):
-            pic.rotation = source_shape.rotation
+        if spec.get("rotation"):
+            pic.rotation = spec["rotation"]
             
     except Exception as e:
         print(f"Could not copy image: {e}")
 
-def copy_text_or_shape(source_shape, target_slide):
+def link_shared_picture(spec, target_slide, images, shared_parts):
+    """Append a clone of the template picture that references a shared image part."""
+    rId = _shared_image_rId(target_slide, spec["image"], images, shared_parts)
+    
+    pic = parse_xml(spec["xml"])
+    pic.xpath("./p:blipFill/a:blip")[0].set(qn("r:embed"), rId)
+    pic.xpath("./p:nvPicPr/p:cNvPr")[0].set("id", str(target_slide.shapes._next_shape_id))
+    target_slide.shapes._spTree.insert_element_before(pic, "p:extLst")
+
+def copy_text_or_shape(spec, target_slide):
     """Copy text boxes or auto shapes to target slide."""
     try:
         # For text boxes, create a new text box
-        if hasattr(source_shape, 'text'):
-            textbox = target_slide.shapes.add_textbox(
-                source_shape.left,
-                source_shape.top, 
-                source_shape.width,
-                source_shape.height
-            )
-            
-            # Copy text content (but we might override this later)
-            textbox.text = source_shape.text
-            
-            # Copy text formatting if possible
-            if source_shape.text_frame and textbox.text_frame:
-                copy_text_formatting(source_shape.text_frame, textbox.text_frame)
+        textbox = target_slide.shapes.add_textbox(
+            spec["left"],
+            spec["top"], 
+            spec["width"],
+            spec["height"]
+        )
         
-        # For shapes, try to recreate based on shape type
-        else:
-            # This is more complex - would need shape-specific logic
-            pass
+        # Copy text content (but we might override this later)
+        textbox.text = spec["text"]
+        
+        # Copy text formatting if possible
+        if textbox.text_frame:
+            copy_text_formatting(spec["paragraphs"], textbox.text_frame)
             
     except Exception as e:
         print(f"Could not copy text/shape: {e}")
 
-def copy_generic_shape(source_shape, target_slide):
+def copy_generic_shape(spec, target_slide):
     """Attempt to copy other shape types."""
     try:
         # This is a placeholder for more complex shape copying
@@ -206,41 +478,31 @@ def copy_generic_shape(source_shape, target_slide):
     except Exception as e:
         print(f"Could not copy generic shape: {e}")
 
-def copy_text_formatting(source_tf, target_tf):
-    """Copy text formatting from source to target text frame."""
+def copy_text_formatting(source_paragraphs, target_tf):
+    """Copy text formatting from captured paragraph specs to target text frame."""
     try:
         # Copy paragraph-level formatting
-        for src_para, tgt_para in zip(source_tf.paragraphs, target_tf.paragraphs):
-            if hasattr(src_para, 'alignment'):
-                tgt_para.alignment = src_para.alignment
-            if hasattr(src_para, 'font'):
-                if src_para.font.name:
-                    tgt_para.font.name = src_para.font.name
-                if src_para.font.size:
-                    tgt_para.font.size = src_para.font.size
+        for src_para, tgt_para in zip(source_paragraphs, target_tf.paragraphs):
+            if src_para["alignment"] is not None:
+                tgt_para.alignment = src_para["alignment"]
+            if src_para["font_name"]:
+                tgt_para.font.name = src_para["font_name"]
+            if src_para["font_size"]:
+                tgt_para.font.size = src_para["font_size"]
                     
     except Exception as e:
         print(f"Could not copy text formatting: {e}")
 
-def populate_slide_content(slide, content):
+def populate_slide_content(slide, title_shape, content_shape, content):
     """
-    Populate slide placeholders with our generated content.
+    Populate the slide's title and body placeholders with our generated content.
     Only updates placeholder text, leaves all other elements intact.
+    Points are strings or {"text", "level", "code"} dicts; a "table" (rows of
+    cell strings) replaces the body placeholder with a table in its place.
     """
     title = content.get("title", "")
     points = content.get("points", [])
     
-    # Find and populate title placeholder
-    title_shape = None
-    content_shape = None
-    
-    for shape in slide.shapes:
-        if shape.is_placeholder:
-            if shape.placeholder_format.type == PP_PLACEHOLDER.TITLE:
-                title_shape = shape
-            elif shape.placeholder_format.type in (PP_PLACEHOLDER.BODY, PP_PLACEHOLDER.OBJECT):
-                content_shape = shape
-    
     # Set title
     if title_shape and title:
         title_shape.text = title
@@ -250,52 +512,51 @@ def populate_slide_content(slide, content):
         tf = content_shape.text_frame
         tf.clear()
         
-        # Add first point
-        if points:
-            p = tf.paragraphs[0]
-            p.text = points[0]
-            
-            # Add remaining points
-            for point_text in points[1:]:
-                new_para = tf.add_paragraph()
-                new_para.text = point_text
-                new_para.level = 0
+        for i, point in enumerate(points):
+            text, level, code = _point_parts(point)
+            para = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
+            para.text = text
+            para.level = level
+            if code:
+                for run in para.runs:
+                    run.font.name = CODE_FONT
+                    run.font.size = CODE_FONT_SIZE
+    
+    # Set table
+    table = content.get("table")
+    if content_shape and table and content_shape.width is not None:
+        replace_with_table(slide, content_shape, table)
+
+def _point_parts(point):
+    """(text, level, is_code) of a point given as a plain string or a dict."""
+    if isinstance(point, dict):
+        return str(point.get("text", "")), min(max(int(point.get("level") or 0), 0), 8), bool(point.get("code"))
+    return str(point), 0, False
+
+def replace_with_table(slide, placeholder, rows):
+    """Fill a table covering the placeholder's area with rows, then remove the placeholder."""
+    columns = max(len(row) for row in rows)
+    graphic_frame = slide.shapes.add_table(
+        len(rows), columns,
+        placeholder.left, placeholder.top, placeholder.width, placeholder.height
+    )
+    for row_cells, table_row in zip(rows, graphic_frame.table.rows):
+        for text, cell in zip(row_cells, table_row.cells):
+            cell.text = str(text)
+    element = placeholder._element
+    element.getparent().remove(element)
 
 def create_basic_presentation(slide_data, output_path):
     """
     Fallback: Create basic presentation when no template is provided.
+    output_path may be a filesystem path or a writable binary file object.
     """
-    prs = Presentation()
-    
-    # Use default layout
-    layout = prs.slide_layouts[1] if len(prs.slide_layouts) > 1 else prs.slide_layouts[0]
+    builder = DeckBuilder()
     
     for content in slide_data:
-        slide = prs.slides.add_slide(layout)
-        
-        # Set title
-        if slide.shapes.title:
-            slide.shapes.title.text = content.get("title", "")
-        
-        # Set content
-        for shape in slide.placeholders:
-            if shape.placeholder_format.type == PP_PLACEHOLDER.BODY:
-                tf = shape.text_frame
-                tf.clear()
-                
-                points = content.get("points", [])
-                if points:
-                    p = tf.paragraphs[0]
-                    p.text = points[0]
-                    
-                    for point_text in points[1:]:
-                        new_p = tf.add_paragraph()
-                        new_p.text = point_text
-                        new_p.level = 0
-                break
-    
-    prs.save(output_path)
-    return output_path
+        builder.add_slide(content)
+    
+    return builder.save(output_path)
 
 
 
@@ -0,0 +1,188 @@
+import asyncio
+import time
+import traceback
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.config import env_float, env_int
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at its depth limit."""
+
+
+class ResultBudgetFull(Exception):
+    """Raised when a pinned result would not fit under max_result_bytes."""
+
+
+class JobManager:
+    """
+    Runs deck generation jobs on a fixed pool of asyncio workers.
+    Submissions beyond max_queue waiting jobs are rejected with QueueFull,
+    and finished jobs (with their result bytes) are kept for result_ttl seconds.
+    Retained result bytes are capped at max_result_bytes: past it, the
+    oldest finished results are dropped first. Pinned results (a batch
+    manifest's decks until its response is sent) are never dropped, and are
+    refused up front instead when they would not fit.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 100, result_ttl: float = 3600.0,
+                 max_result_bytes: int = 512 * 1024 * 1024):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self.max_result_bytes = max_result_bytes
+        self._result_bytes = 0
+        self._pinned: Dict[str, int] = {}
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+
+    def start(self):
+        """Start the worker tasks on the running loop (otherwise done on first submit)."""
+        self._ensure_workers()
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._queue is not None and self._worker_tasks and self._worker_tasks[0].get_loop() is loop:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker_tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, run: Callable[[], Awaitable[bytes]], filename: str) -> Dict[str, Any]:
+        """
+        Queue run() and return the new job. run is a coroutine function that
+        returns the finished deck bytes.
+        """
+        self._ensure_workers()
+        self._prune()
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "filename": filename,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "result": None,
+        }
+        try:
+            self._queue.put_nowait((job, run))
+        except asyncio.QueueFull:
+            raise QueueFull(f"Job queue is full ({self.max_queue} waiting).")
+        self._jobs[job["id"]] = job
+        return job
+
+    def add_completed(self, result: bytes, filename: str, pin: bool = False) -> Dict[str, Any]:
+        """
+        Record an already-finished result so it can be fetched like a job.
+        With pin=True it is kept until unpin() and raises ResultBudgetFull if
+        pinned results would exceed max_result_bytes.
+        """
+        if pin and sum(self._pinned.values()) + len(result) > self.max_result_bytes:
+            raise ResultBudgetFull(f"Finished results are limited to {self.max_result_bytes} bytes.")
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "succeeded",
+            "filename": filename,
+            "created_at": now,
+            "started_at": now,
+            "finished_at": now,
+            "error": None,
+            "result": result,
+        }
+        self._jobs[job["id"]] = job
+        self._result_bytes += len(result)
+        if pin:
+            self._pinned[job["id"]] = len(result)
+        self._prune()
+        return job
+
+    def unpin(self, job_ids):
+        """Let pinned results be dropped again, oldest first, like any other."""
+        for job_id in job_ids:
+            self._pinned.pop(job_id, None)
+        self._prune()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self):
+        while True:
+            job, run = await self._queue.get()
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            try:
+                job["result"] = await run()
+                job["status"] = "succeeded"
+            except asyncio.CancelledError:
+                job["status"] = "failed"
+                job["error"] = "Job was cancelled."
+                raise
+            except Exception as e:
+                print(f"=== Exception in job {job['id']} ===")
+                traceback.print_exc()
+                job["status"] = "failed"
+                job["error"] = str(e)
+            finally:
+                job["finished_at"] = time.time()
+                if job["result"] is not None:
+                    self._result_bytes += len(job["result"])
+                    self._prune()
+                self._queue.task_done()
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff and job_id not in self._pinned
+        ]
+        for job_id in expired:
+            self._forget(job_id)
+
+        if self._result_bytes > self.max_result_bytes:
+            # Oldest results go first; the newest is kept even if it alone is over the cap
+            finished = sorted(
+                (job for job in self._jobs.values() if job["result"] is not None),
+                key=lambda job: job["finished_at"],
+            )
+            for job in finished[:-1]:
+                if self._result_bytes <= self.max_result_bytes:
+                    break
+                if job["id"] not in self._pinned:
+                    self._forget(job["id"])
+
+    def _forget(self, job_id: str):
+        job = self._jobs.pop(job_id)
+        if job["result"] is not None:
+            self._result_bytes -= len(job["result"])
+
+    async def shutdown(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+
+def job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job (everything except the result bytes)."""
+    status = {key: value for key, value in job.items() if key != "result"}
+    status["status_url"] = f"/jobs/{job['id']}"
+    if job["status"] == "succeeded":
+        status["result_url"] = f"/jobs/{job['id']}/result"
+    return status
+
+
+job_manager = JobManager(
+    workers=env_int("JOB_WORKERS", 4),
+    max_queue=env_int("JOB_QUEUE_MAX", 100),
+    result_ttl=env_float("JOB_RESULT_TTL", 3600.0),
+    max_result_bytes=env_int("JOB_RESULT_MAX_BYTES", 512 * 1024 * 1024),
+)
@@ -1,139 +1,458 @@
+import asyncio
 import json
 import re
-from typing import List, Dict
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 
+from core.call_policy import call_policy, describe, is_retryable
+from core.chunking import merge_slide_lists, split_into_sections
+from core.clients import client_registry, key_fingerprint
+from core.config import env_int
+from core.offline import INPUT_FORMATS, looks_like_markdown, markdown_to_slides, structure_text
+from core.metrics import LLM_FALLBACKS, LLM_PARSE_FAILURES, LLM_REQUEST_SECONDS, LLM_REQUESTS, RESPONSE_CACHE, observe_stage, span
+from core.rate_limit import estimate_tokens, rate_limits
+from core.response_cache import cache_key, response_cache
+from core.slide_parser import SLIDE_DECK_SCHEMA, IncrementalSlideParser, extract_slides, slides_from_payload
 
-def generate_slide_content(text_content: str, guidance: str = "", llm_provider: str = "openai", api_key: str = "") -> List[Dict]:
+# Each default model supports its provider's structured output
+DEFAULT_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-sonnet-20240229",
+    "gemini": "gemini-1.5-flash-latest",
+}
+
+# Completion budget per call; also counted against the provider's token rate limit
+MAX_OUTPUT_TOKENS = 2000
+
+# Upper bound on in-flight calls per provider for this worker. Override per
+# provider with e.g. LLM_MAX_CONCURRENCY_OPENAI=16.
+DEFAULT_MAX_CONCURRENCY = env_int("LLM_MAX_CONCURRENCY", 32)
+
+# Inputs longer than this are structured section by section in parallel.
+LONG_DOCUMENT_CHARS = env_int("LONG_DOCUMENT_CHARS", 12000)
+CHUNK_CHARS = env_int("LONG_DOCUMENT_CHUNK_CHARS", 8000)
+
+# Structures text locally with core.offline instead of calling an LLM; needs no API key
+OFFLINE_PROVIDER = "offline"
+
+SYSTEM_PROMPT = "You are a presentation expert who converts text into structured slide content."
+
+# Provider-specific wrappers around SLIDE_DECK_SCHEMA
+OPENAI_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "slide_deck", "strict": True, "schema": SLIDE_DECK_SCHEMA},
+}
+ANTHROPIC_TOOL = {
+    "name": "create_slides",
+    "description": "Record the structured slide deck.",
+    "input_schema": SLIDE_DECK_SCHEMA,
+}
+
+def _gemini_schema(schema):
+    """SLIDE_DECK_SCHEMA without the keywords Gemini's response_schema rejects."""
+    if isinstance(schema, dict):
+        return {key: _gemini_schema(value) for key, value in schema.items() if key != "additionalProperties"}
+    return schema
+
+GEMINI_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": _gemini_schema(SLIDE_DECK_SCHEMA),
+}
+
+_provider_semaphores: Dict[str, tuple] = {}
+
+
+def _provider_semaphore(provider: str) -> asyncio.Semaphore:
+    """Return the concurrency gate for a provider on the running event loop."""
+    loop = asyncio.get_running_loop()
+    entry = _provider_semaphores.get(provider)
+    if entry is None or entry[0] is not loop:
+        limit = env_int(f"LLM_MAX_CONCURRENCY_{provider.upper()}", DEFAULT_MAX_CONCURRENCY)
+        entry = (loop, asyncio.Semaphore(max(1, limit)))
+        _provider_semaphores[provider] = entry
+    return entry[1]
+
+
+async def generate_slide_content(text_content: str, guidance: str = "", llm_provider: str = "openai", api_key: str = "", long_document: Optional[bool] = None, input_format: str = "text") -> List[Dict]:
     """
     Calls an LLM API to generate structured slide content from input text.
     Returns a list of dictionaries with slide data.
+    The provider call is awaited, so other requests keep running meanwhile.
+    Long inputs (or long_document=True) are split into sections that are
+    structured concurrently and merged back into one deck.
+    llm_provider="offline" skips the LLM and structures the text locally.
+    Markdown input (input_format="markdown", or "auto" when detected and no
+    guidance is given) is mapped straight to slides without structuring at all.
     """
+    slides = await asyncio.to_thread(_markdown_slides, text_content, guidance, input_format)
+    if slides is not None:
+        return slides
+    
+    if llm_provider.lower() == OFFLINE_PROVIDER:
+        return await asyncio.to_thread(_offline_structure, text_content, guidance)
+    
     if not api_key:
         raise ValueError("API key is required")
     
-    # Create the prompt
-    base_prompt = f"""
-Convert the following text into a structured PowerPoint presentation. 
+    if long_document is None:
+        long_document = len(text_content) > LONG_DOCUMENT_CHARS
+    
+    sections = split_into_sections(text_content, CHUNK_CHARS) if long_document else [text_content]
+    
+    # Identical (normalized) requests reuse an earlier structuring result
+    provider = llm_provider.lower()
+    key = cache_key(
+        text_content, guidance, provider, DEFAULT_MODELS.get(provider, ""),
+        mode="sections" if len(sections) > 1 else "single",
+    )
+    cached = response_cache.get(key)
+    RESPONSE_CACHE.inc(result="miss" if cached is None else "hit")
+    if cached is not None:
+        print("Using cached slide structure")
+        return cached
+    
+    if len(sections) > 1:
+        slides, complete = await _generate_long_document(sections, guidance, llm_provider, api_key)
+        if complete and slides:
+            response_cache.set(key, slides)
+        return slides
+    
+    try:
+        slides, used = await _call_provider(llm_provider, _build_prompt(text_content, guidance), api_key)
+        # Failover output came from another model, so it is not cached under this one
+        if slides and used == provider:
+            response_cache.set(key, slides)
+        return slides
+    
+    except Exception as e:
+        print(f"Error calling LLM API: {describe(e)}")
+        # Fallback: create slides from text analysis
+        return await _fallback_text_analysis(text_content, guidance)
 
+def _build_prompt(text_content: str, guidance: str, part: Optional[int] = None, parts: Optional[int] = None) -> str:
+    """Create the slide-structuring prompt, optionally for one part of a longer document."""
+    if part is None:
+        scope = ""
+        slide_count = "about 5-12 slides"
+    else:
+        scope = f"""
+This text is part {part} of {parts} of a longer document. Only create slides for this part;
+do not add an overall introduction, agenda or conclusion unless this part contains one.
+"""
+        slide_count = "about 2-6 slides for this part"
+    
+    with span("prompt_build"):
+        return f"""
+Convert the following text into a structured PowerPoint presentation. 
+{scope}
 Text to convert:
 {text_content}
 
 Additional guidance: {guidance if guidance else "Standard presentation format"}
 
-Requirements:
-1. Analyze the content and determine the optimal number of slides (typically 5-12 slides)
-2. Create a logical flow with clear sections
-3. Extract key points and organize them hierarchically
-4. Ensure each slide has a clear, descriptive title
-5. Include 2-6 bullet points per slide maximum
-6. Make content concise and presentation-friendly
-
-Return the response as a JSON array with this exact format:
-[
-  {{
-    "title": "Introduction",
-    "points": ["Key point 1", "Key point 2", "Key point 3"]
-  }},
-  {{
-    "title": "Main Topic",
-    "points": ["Supporting detail 1", "Supporting detail 2"]
-  }}
-]
-
-Important: Return ONLY the JSON array, no additional text or formatting.
+Use {slide_count} in a logical flow, each with a clear, descriptive title and
+2-6 concise bullet points. Respond as {{"slides": [{{"title": ..., "points": [...]}}]}}.
 """
 
+async def _call_provider(llm_provider: str, prompt: str, api_key: str) -> Tuple[List[Dict], str]:
+    """
+    Dispatch a prompt under the call policy (timeouts, retries, hedging,
+    failover). Returns (slides, provider that answered).
+    """
+    provider = llm_provider.lower()
+    if provider not in _PROVIDER_CALLS:
+        raise ValueError(f"Unsupported LLM provider: {llm_provider}")
+    
+    return await call_policy.run(
+        provider, api_key,
+        lambda name, key: _attempt_provider(name, prompt, key),
+        slot=lambda name, key: _provider_slot(name, prompt, key),
+    )
+
+@asynccontextmanager
+async def _provider_slot(provider: str, prompt: str, api_key: str):
+    """Hold a rate-limit admission and a concurrency slot for one provider call."""
+    await _admit(provider, prompt, api_key)
+    async with _provider_semaphore(provider):
+        yield
+
+async def _admit(provider: str, prompt: str, api_key: str):
+    """Queue until the provider's request and token budgets for this key allow the call."""
+    with span("rate_limit_wait"):
+        await rate_limits.acquire(
+            provider, key_fingerprint(api_key),
+            estimate_tokens(SYSTEM_PROMPT + prompt, MAX_OUTPUT_TOKENS),
+        )
+
+async def _attempt_provider(provider: str, prompt: str, api_key: str) -> List[Dict]:
+    """One provider call; the caller already holds its slot (see _provider_slot)."""
+    start = time.perf_counter()
+    outcome = "error"
     try:
-        if llm_provider.lower() == "openai":
-            return _call_openai(base_prompt, api_key)
-        elif llm_provider.lower() == "anthropic":
-            return _call_anthropic(base_prompt, api_key)
-        elif llm_provider.lower() == "gemini":
-            return _call_gemini(base_prompt, api_key)
-        else:
-            raise ValueError(f"Unsupported LLM provider: {llm_provider}")
+        slides = await _PROVIDER_CALLS[provider](prompt, api_key)
+        outcome = "success"
+        return slides
+    except asyncio.CancelledError:
+        # Timed out, or lost a hedge race
+        outcome = "cancelled"
+        raise
+    finally:
+        _record_llm_call(provider, outcome, time.perf_counter() - start)
+
+def _record_llm_call(provider: str, outcome: str, seconds: float):
+    LLM_REQUESTS.inc(provider=provider, outcome=outcome)
+    LLM_REQUEST_SECONDS.observe(seconds, provider=provider, outcome=outcome)
+    observe_stage("llm_call", seconds)
+
+async def _generate_long_document(sections: List[str], guidance: str, llm_provider: str, api_key: str):
+    """
+    Map each section to slides concurrently, then reduce into one ordered deck.
+    Returns (slides, complete) where complete is False if any section fell back.
+    """
+    print(f"Long document mode: {len(sections)} sections")
     
-    except Exception as e:
-        print(f"Error calling LLM API: {str(e)}")
-        # Fallback: create slides from text analysis
-        return _fallback_text_analysis(text_content, guidance)
+    async def structure_section(index: int, section: str):
+        prompt = _build_prompt(section, guidance, part=index + 1, parts=len(sections))
+        try:
+            section_slides, used = await _call_provider(llm_provider, prompt, api_key)
+            return section_slides, used == llm_provider.lower()
+        except Exception as e:
+            print(f"Error calling LLM API for section {index + 1}: {describe(e)}")
+            # Fallback for this section only
+            return await _fallback_text_analysis(section, guidance), False
+    
+    results = await asyncio.gather(
+        *(structure_section(i, section) for i, section in enumerate(sections))
+    )
+    slides = merge_slide_lists([section_slides for section_slides, _ in results])
+    return slides, all(ok for _, ok in results)
 
-def _call_openai(prompt: str, api_key: str) -> List[Dict]:
+async def _call_openai(prompt: str, api_key: str) -> List[Dict]:
     """Call OpenAI API"""
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a presentation expert who converts text into structured slide content."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
+        async with client_registry.lease("openai", api_key) as client:
+            response = await client.chat.completions.create(
+                model=DEFAULT_MODELS["openai"],
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format=OPENAI_RESPONSE_FORMAT,
+                temperature=0.7,
+                max_tokens=MAX_OUTPUT_TOKENS
+            )
         
-        content = response.choices[0].message.content.strip()
-        return _parse_llm_response(content)
+        message = response.choices[0].message
+        if getattr(message, "refusal", None):
+            raise ValueError(f"OpenAI refused the request: {message.refusal}")
+        return _parse_structured_response(message.content)
     
     except Exception as e:
-        print(f"OpenAI API error: {str(e)}")
+        print(f"OpenAI API error: {describe(e)}")
         raise
 
-def _call_anthropic(prompt: str, api_key: str) -> List[Dict]:
+async def _call_anthropic(prompt: str, api_key: str) -> List[Dict]:
     """Call Anthropic API"""
     try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=api_key)
+        async with client_registry.lease("anthropic", api_key) as client:
+            response = await client.messages.create(
+                model=DEFAULT_MODELS["anthropic"],
+                max_tokens=MAX_OUTPUT_TOKENS,
+                system=SYSTEM_PROMPT,
+                tools=[ANTHROPIC_TOOL],
+                tool_choice={"type": "tool", "name": ANTHROPIC_TOOL["name"]},
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
         
-        response = client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=2000,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        content = response.content[0].text.strip()
-        return _parse_llm_response(content)
+        for block in response.content:
+            if block.type == "tool_use":
+                return _parse_structured_response(block.input)
+        # No tool call; parse whatever text came back
+        return _parse_llm_response("".join(getattr(block, "text", "") for block in response.content))
     
     except Exception as e:
-        print(f"Anthropic API error: {str(e)}")
+        print(f"Anthropic API error: {describe(e)}")
         raise
 
-def _call_gemini(prompt: str, api_key: str) -> List[Dict]:
+async def _call_gemini(prompt: str, api_key: str) -> List[Dict]:
     """Call Google Gemini API"""
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash-latest") 
-        
-        response = model.generate_content(prompt)
-        content = response.text.strip()
-        return _parse_llm_response(content)
+        async with client_registry.lease("gemini", api_key) as client:
+            model = client.model(DEFAULT_MODELS["gemini"], system_instruction=SYSTEM_PROMPT)
+            response = await model.generate_content_async(prompt, generation_config=GEMINI_GENERATION_CONFIG)
+        return _parse_structured_response(response.text)
     
     except Exception as e:
-        print(f"Gemini API error: {str(e)}")
+        print(f"Gemini API error: {describe(e)}")
         raise
 
+_PROVIDER_CALLS = {
+    "openai": _call_openai,
+    "anthropic": _call_anthropic,
+    "gemini": _call_gemini,
+}
+
+async def _stream_openai(prompt: str, api_key: str) -> AsyncIterator[str]:
+    """Stream completion text from OpenAI"""
+    async with client_registry.lease("openai", api_key) as client:
+        stream = await client.chat.completions.create(
+            model=DEFAULT_MODELS["openai"],
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            response_format=OPENAI_RESPONSE_FORMAT,
+            temperature=0.7,
+            max_tokens=MAX_OUTPUT_TOKENS,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+async def _stream_anthropic(prompt: str, api_key: str) -> AsyncIterator[str]:
+    """Stream the slide tool call's JSON input from Anthropic"""
+    async with client_registry.lease("anthropic", api_key) as client:
+        async with client.messages.stream(
+            model=DEFAULT_MODELS["anthropic"],
+            max_tokens=MAX_OUTPUT_TOKENS,
+            system=SYSTEM_PROMPT,
+            tools=[ANTHROPIC_TOOL],
+            tool_choice={"type": "tool", "name": ANTHROPIC_TOOL["name"]},
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ) as stream:
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "input_json_delta":
+                    yield event.delta.partial_json
+
+async def _stream_gemini(prompt: str, api_key: str) -> AsyncIterator[str]:
+    """Stream completion text from Google Gemini"""
+    async with client_registry.lease("gemini", api_key) as client:
+        model = client.model(DEFAULT_MODELS["gemini"], system_instruction=SYSTEM_PROMPT)
+        response = await model.generate_content_async(prompt, generation_config=GEMINI_GENERATION_CONFIG, stream=True)
+        async for chunk in response:
+            yield chunk.text
+
+_PROVIDER_STREAMS = {
+    "openai": _stream_openai,
+    "anthropic": _stream_anthropic,
+    "gemini": _stream_gemini,
+}
+
+async def stream_slide_content(text_content: str, guidance: str = "", llm_provider: str = "openai", api_key: str = "", input_format: str = "text") -> AsyncIterator[Dict]:
+    """
+    Streaming variant of generate_slide_content.
+    Yields each slide dict as soon as its JSON object is complete in the
+    provider's token stream. Falls back to text analysis only if the stream
+    fails before producing any slide.
+    """
+    slides = await asyncio.to_thread(_markdown_slides, text_content, guidance, input_format)
+    if slides is not None:
+        for slide in slides:
+            yield slide
+        return
+    
+    if llm_provider.lower() == OFFLINE_PROVIDER:
+        for slide in await asyncio.to_thread(_offline_structure, text_content, guidance):
+            yield slide
+        return
+    
+    if not api_key:
+        raise ValueError("API key is required")
+    
+    provider = llm_provider.lower()
+    key = cache_key(text_content, guidance, provider, DEFAULT_MODELS.get(provider, ""), mode="single")
+    cached = response_cache.get(key)
+    RESPONSE_CACHE.inc(result="miss" if cached is None else "hit")
+    if cached is not None:
+        print("Using cached slide structure")
+        for slide in cached:
+            yield slide
+        return
+    
+    slides = []
+    parser = IncrementalSlideParser()
+    try:
+        stream = _PROVIDER_STREAMS.get(provider)
+        if stream is None:
+            raise ValueError(f"Unsupported LLM provider: {llm_provider}")
+        
+        prompt = _build_prompt(text_content, guidance)
+        for attempt in range(1, call_policy.max_attempts + 1):
+            try:
+                async with _provider_slot(provider, prompt, api_key):
+                    start = time.perf_counter()
+                    try:
+                        async for text in call_policy.iterate(stream(prompt, api_key)):
+                            for slide in parser.feed(text):
+                                slides.append(slide)
+                                yield slide
+                    except Exception:
+                        _record_llm_call(provider, "error", time.perf_counter() - start)
+                        raise
+                    _record_llm_call(provider, "success", time.perf_counter() - start)
+                break
+            except Exception as e:
+                # Slides already sent cannot be taken back, so only retry a stream that produced none
+                if slides or attempt == call_policy.max_attempts or not is_retryable(e):
+                    raise
+                delay = call_policy.backoff(attempt, e)
+                print(f"{provider} stream attempt {attempt} failed ({describe(e)}); retrying in {delay:.1f}s")
+                parser = IncrementalSlideParser()
+                await asyncio.sleep(delay)
+    
+    except Exception as e:
+        print(f"Error streaming from LLM API: {describe(e)}")
+        if slides:
+            return
+        for slide in await _fallback_text_analysis(text_content, guidance):
+            yield slide
+        return
+    
+    if parser.done and slides:
+        response_cache.set(key, slides)
+    elif not slides:
+        print("Streamed response contained no slides")
+        for slide in await _fallback_text_analysis(text_content, guidance):
+            yield slide
+
+def _parse_structured_response(payload) -> List[Dict]:
+    """
+    Slides from schema-constrained provider output: a JSON string or an
+    already-decoded object (Anthropic tool input).
+    """
+    with span("response_parse"):
+        if isinstance(payload, str):
+            try:
+                payload = json.loads(payload)
+            except json.JSONDecodeError:
+                # Only happens when output was cut off (e.g. at max_tokens)
+                return _parse_llm_json(payload)
+        return slides_from_payload(payload)
+
 def _parse_llm_response(content: str) -> List[Dict]:
     """Parse LLM response and extract JSON"""
-    try:
-        # Try to find JSON in the response
-        json_match = re.search(r'\[.*\]', content, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            return json.loads(json_str)
-        else:
-            # Try parsing the entire content as JSON
-            return json.loads(content)
-    
-    except json.JSONDecodeError as e:
-        print(f"Failed to parse JSON response: {str(e)}")
-        print(f"Raw content: {content}")
-        # Fallback to manual parsing
-        return _manual_parse_response(content)
+    with span("response_parse"):
+        return _parse_llm_json(content)
+
+def _parse_llm_json(content: str) -> List[Dict]:
+    # Balance brackets over the response once, ignoring fences and prose
+    slides, complete = extract_slides(content)
+    if slides:
+        if not complete:
+            print(f"LLM response was truncated; recovered {len(slides)} complete slides")
+        return slides
+    
+    LLM_PARSE_FAILURES.inc()
+    print("Failed to find slide JSON in response")
+    print(f"Raw content: {content}")
+    # Fallback to manual parsing
+    return _manual_parse_response(content)
 
 def _manual_parse_response(content: str) -> List[Dict]:
     """Manually parse LLM response if JSON parsing fails"""
@@ -180,52 +499,35 @@ def _manual_parse_response(content: str) -> List[Dict]:
     
     return slides
 
-def _fallback_text_analysis(text_content: str, guidance: str) -> List[Dict]:
-    """Fallback method to create slides without LLM"""
+def maps_directly(text_content: str, guidance: str, input_format: str) -> bool:
+    """Whether the text is mapped straight to slides as markdown, without structuring."""
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input_format: {input_format}")
+    if input_format == "auto":
+        return not guidance.strip() and looks_like_markdown(text_content)
+    return input_format == "markdown"
+
+def requires_api_key(text_content: str, guidance: str, llm_provider: str, input_format: str) -> bool:
+    """Whether structuring this input calls an LLM (neither offline nor mapped directly)."""
+    return llm_provider.lower() != OFFLINE_PROVIDER and not maps_directly(text_content, guidance, input_format)
+
+def _markdown_slides(text_content: str, guidance: str, input_format: str) -> Optional[List[Dict]]:
+    """
+    Slides mapped straight from markdown input, or None if the text needs
+    structuring. Direct mapping would ignore guidance, so "auto" only
+    detects markdown when there is none.
+    """
+    if not maps_directly(text_content, guidance, input_format):
+        return None
+    with span("markdown_parse"):
+        return markdown_to_slides(text_content)
+
+def _offline_structure(text_content: str, guidance: str) -> List[Dict]:
+    with span("offline_structure"):
+        return structure_text(text_content, guidance)
+
+async def _fallback_text_analysis(text_content: str, guidance: str) -> List[Dict]:
+    """Fallback method to create slides without LLM (in a thread, off the event loop)"""
     print("Using fallback text analysis...")
-    
-    # Simple text analysis approach
-    paragraphs = [p.strip() for p in text_content.split('\n\n') if p.strip()]
-    
-    if len(paragraphs) <= 1:
-        # Split by sentences if no clear paragraphs
-        sentences = [s.strip() for s in text_content.split('.') if s.strip()]
-        paragraphs = []
-        current_para = ""
-        for i, sentence in enumerate(sentences):
-            current_para += sentence + ". "
-            if (i + 1) % 3 == 0 or i == len(sentences) - 1:
-                paragraphs.append(current_para.strip())
-                current_para = ""
-    
-    slides = []
-    
-    # Create title slide
-    title = "Presentation Overview"
-    if guidance:
-        title = f"{guidance.title()}"
-    
-    slides.append({
-        "title": title,
-        "points": [f"Based on provided content", f"Generated automatically"]
-    })
-    
-    # Create content slides
-    for i, para in enumerate(paragraphs[:10]):  # Limit to 10 content slides
-        slide_title = f"Topic {i+1}"
-        
-        # Try to extract a title from the first sentence
-        first_sentence = para.split('.')[0].strip()
-        if len(first_sentence.split()) <= 8:
-            slide_title = first_sentence
-        
-        # Split paragraph into points
-        sentences = [s.strip() + '.' for s in para.split('.') if s.strip()]
-        points = sentences[:5]  # Max 5 points per slide
-        
-        slides.append({
-            "title": slide_title,
-            "points": points
-        })
-    
-    return slides
\ No newline at end of file
+    LLM_FALLBACKS.inc()
+    return await asyncio.to_thread(_offline_structure, text_content, guidance)
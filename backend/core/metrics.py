@@ -0,0 +1,167 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = 'le="%s"' % _format_value(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "ppt_stage_duration_seconds", "Latency of each generation pipeline stage.", ["stage"])
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "ppt_http_request_duration_seconds", "HTTP request latency by route.", ["method", "route", "status"])
+LLM_REQUEST_SECONDS = registry.histogram(
+    "ppt_llm_request_duration_seconds", "LLM provider call latency.", ["provider", "outcome"])
+LLM_REQUESTS = registry.counter(
+    "ppt_llm_requests_total", "LLM provider calls by outcome.", ["provider", "outcome"])
+LLM_FALLBACKS = registry.counter(
+    "ppt_llm_fallback_total", "Slide structures produced by the no-LLM fallback instead of the LLM.")
+LLM_PARSE_FAILURES = registry.counter(
+    "ppt_llm_parse_failures_total", "LLM responses that were not valid JSON and needed manual parsing.")
+TEMPLATE_CACHE = registry.counter(
+    "ppt_template_cache_total", "Template analysis cache lookups.", ["result"])
+RESPONSE_CACHE = registry.counter(
+    "ppt_llm_cache_total", "LLM slide-structure cache lookups.", ["result"])
+STARTUP_SECONDS = registry.histogram(
+    "ppt_startup_duration_seconds", "Time spent in each start-up warm-up step.", ["step"])
+SINGLE_FLIGHT = registry.counter(
+    "ppt_single_flight_total", "Deck generations that started work (leader) or joined an identical one in flight.", ["result"])
+
+# Spans recorded while a collector is active are also captured there, so work
+# done in render worker processes can be shipped back to the parent.
+_collector: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("span_collector", default=None)
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    collected = _collector.get()
+    if collected is not None:
+        collected.append((stage, seconds))
+
+
+@contextmanager
+def span(stage: str):
+    """Time a pipeline stage into ppt_stage_duration_seconds{stage=...}."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_spans():
+    """Capture every span recorded inside the block as (stage, seconds) pairs."""
+    collected = []
+    token = _collector.set(collected)
+    try:
+        yield collected
+    finally:
+        _collector.reset(token)
+
+
+def record_spans(spans: Iterable[Tuple[str, float]]):
+    """Record spans that were measured in another process."""
+    for stage, seconds in spans:
+        STAGE_SECONDS.observe(seconds, stage=stage)
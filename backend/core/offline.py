@@ -0,0 +1,544 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.chunking import MAX_POINTS_PER_SLIDE
+
+# Patterns avoid adjacent quantifiers over the same characters, so a failed
+# match cannot backtrack quadratically; closing "#"s are stripped in _heading
+_ATX_HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.*)$")
+_SETEXT_UNDERLINE_RE = re.compile(r"^\s{0,3}(?:=+|-+)\s*$")
+_LIST_ITEM_RE = re.compile(r"^([ \t]*)(?:[-*+•]|\d{1,9}[.)])\s+(.*)$")
+_FENCE_RE = re.compile(r"^\s{0,3}(?:```|~~~)")
+_TABLE_ROW_RE = re.compile(r"^\s*\|(.*)\|\s*$")
+_DIVIDER_CELL_RE = re.compile(r":?-{2,}:?")
+_CELL_SPLIT_RE = re.compile(r"(?<!\\)\|")
+_RULE_RE = re.compile(r"^\s{0,3}(?:[-*_]\s*){3,}$")
+_LINK_RE = re.compile(r"!?\[([^\[\]]*)\]\([^()]*\)")
+_MARKUP_RE = re.compile(r"\*\*|__|`")
+_SPACE_RE = re.compile(r"\s+")
+
+# A sentence ends at . ! or ? (plus closing quotes/brackets) followed by
+# whitespace and something that can start a sentence. Matches only start at
+# the first terminator of a run, so each run is tried once.
+_SENTENCE_END_RE = re.compile(r"(?<![.!?])[.!?]+[\"')\]”’]*\s+(?=[\"'(\[“‘]?[^\W_a-z])")
+_WORD_RE = re.compile(r"[^\W\d_][\w'’-]*|\d[\d.,]*")
+
+_ABBREVIATIONS = frozenset("""
+    mr mrs ms dr prof sr jr st vs etc e.g i.e eg ie cf al approx dept est fig inc ltd co corp
+    jan feb mar apr jun jul aug sep sept oct nov dec no nos vol pp ca
+""".split())
+
+_STOPWORDS = frozenset("""
+    a about above after again against all also am an and any are as at be because been before
+    being below between both but by can could did do does doing down during each few for from
+    further had has have having he her here hers herself him himself his how i if in into is it
+    its itself just let me more most my myself no nor not now of off on once only or other our
+    ours ourselves out over own same she should so some such than that the their theirs them
+    themselves then there these they this those through to too under until up upon us very was
+    we were what when where which while who whom why will with within without would you your
+    yours yourself yourselves may might must shall however therefore thus also one two many much
+    well like get got make made use used using via per its it's we're they're i'm can't don't
+""".split())
+
+# Values of the input_format option: "markdown" maps the text straight to
+# slides, "text" always structures it, "auto" picks based on looks_like_markdown
+INPUT_FORMATS = ("auto", "markdown", "text")
+
+# Deepest paragraph level used for nested list items (PowerPoint allows 0-8)
+MAX_LEVEL = 4
+
+# Source sentences summarized into one slide before a section continues on the next
+SENTENCES_PER_SLIDE = 12
+MAX_POINT_CHARS = 200
+MAX_TITLE_WORDS = 8
+
+# Guidance words asking for a short deck, which keeps fewer sentences per slide
+_BRIEF_TERMS = frozenset("brief concise short summary summarize executive pitch overview highlights".split())
+BRIEF_POINTS_PER_SLIDE = 3
+# Score multiplier per guidance term a sentence contains
+FOCUS_BOOST = 1.0
+
+
+def structure_text(text_content: str, guidance: str = "") -> List[Dict]:
+    """
+    Structure text into slides without an LLM, deterministically and in time
+    linear in the input.
+    Markdown headings become slide titles and list items become points.
+    Prose is split into sentences and the most representative ones (by
+    TF-IDF weight of their words within the section) are kept as points.
+    Untitled prose and lists are titled by their top key phrase.
+    guidance steers the summary: sentences that share its terms are
+    preferred, and asking for something brief (e.g. "concise investor
+    pitch") keeps fewer sentences per slide. Always returns at least one
+    slide, titled after the guidance when there is nothing to structure.
+    """
+    sections = _parse_blocks(text_content)
+    blocks = [block for section in sections for block in section["items"] + section["paragraphs"]]
+    idf = _inverse_document_frequencies(blocks)
+
+    guidance_terms = set(_terms(guidance))
+    limit = BRIEF_POINTS_PER_SLIDE if guidance_terms & _BRIEF_TERMS else MAX_POINTS_PER_SLIDE
+    focus = guidance_terms - _BRIEF_TERMS
+
+    slides = []
+    for section in sections:
+        slides.extend(_section_slides(section, idf, focus, limit))
+    if not slides:
+        title = " ".join(guidance.split()[:MAX_TITLE_WORDS])
+        slides.append({"title": _title_case(title) if title else "Presentation Overview", "points": []})
+    return slides
+
+
+
+def looks_like_markdown(text: str) -> bool:
+    """
+    Whether text is already slide-shaped markdown: it has at least one
+    heading and at least half of its non-blank lines are headings, list
+    items, table rows or code.
+    """
+    headings = structured = lines = 0
+    in_fence = False
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        lines += 1
+        if _FENCE_RE.match(line):
+            in_fence = not in_fence
+            structured += 1
+        elif in_fence or _LIST_ITEM_RE.match(line) or _TABLE_ROW_RE.match(line):
+            structured += 1
+        elif _ATX_HEADING_RE.match(line):
+            headings += 1
+            structured += 1
+    return headings > 0 and structured * 2 >= lines
+
+
+class EmptyMarkdown(ValueError):
+    """Markdown input has nothing to put on a slide: no headings, points or tables."""
+
+
+def markdown_to_slides(text: str) -> List[Dict]:
+    """
+    Map markdown straight to slide data in one pass over the lines.
+    Every heading starts a slide. List items become points whose "level" is
+    their nesting depth, paragraphs become level-0 points and fenced code
+    becomes a single "code" point. A table becomes the slide's "table" (rows
+    of cell strings, header first); a slide holds either points or a table,
+    so content after a table, or more than MAX_POINTS_PER_SLIDE top-level
+    points, continues on a "(cont.)" slide. Sub-headings without content
+    are dropped, unless the input is nothing but headings; input with no
+    headings or content at all raises EmptyMarkdown.
+    """
+    builder = _SlideBuilder()
+    paragraph: List[str] = []
+    code: Optional[List[str]] = None
+    table: List[List[str]] = []
+    indents: List[int] = []
+
+    def flush_paragraph():
+        if paragraph:
+            builder.add_point(_clean(" ".join(paragraph)), 0)
+            paragraph.clear()
+
+    def flush_table():
+        if table:
+            builder.add_table(list(table))
+            table.clear()
+
+    for line in text.splitlines():
+        if code is not None:
+            if _FENCE_RE.match(line):
+                builder.add_point("\n".join(code), 0, code=True)
+                code = None
+            else:
+                code.append(line.rstrip())
+            continue
+
+        stripped = line.strip()
+        row = _TABLE_ROW_RE.match(line)
+        if table and not row:
+            flush_table()
+
+        if _FENCE_RE.match(line):
+            flush_paragraph()
+            code = []
+        elif not stripped:
+            flush_paragraph()
+        elif row:
+            flush_paragraph()
+            if not _is_table_divider(row.group(1)):
+                table.append([_clean(cell.replace("\\|", "|")) for cell in _CELL_SPLIT_RE.split(row.group(1))])
+        elif _ATX_HEADING_RE.match(line):
+            flush_paragraph()
+            level, title = _heading(line)
+            builder.start(_clean(title), level)
+            indents.clear()
+        elif _SETEXT_UNDERLINE_RE.match(line) and len(paragraph) == 1:
+            builder.start(_clean(paragraph.pop()), 1 if stripped[0] == "=" else 2)
+            indents.clear()
+        elif _RULE_RE.match(line):
+            flush_paragraph()
+        else:
+            item = _LIST_ITEM_RE.match(line)
+            if item:
+                flush_paragraph()
+                builder.add_point(_clean(item.group(2)), _nesting_level(indents, item.group(1)), item=True)
+            elif builder.last_point_is_item and not paragraph and line[:1] in (" ", "\t"):
+                # Indented continuation of the previous list item
+                builder.extend_point(_clean(stripped))
+            else:
+                paragraph.append(stripped)
+                indents.clear()
+
+    if code is not None:
+        builder.add_point("\n".join(code), 0, code=True)
+    flush_paragraph()
+    flush_table()
+    slides = builder.finish()
+    if not slides:
+        raise EmptyMarkdown("Markdown input has no headings or content to put on slides.")
+    return slides
+
+
+def _nesting_level(indents: List[int], indent: str) -> int:
+    """Nesting depth of a list item from its indentation, tolerant of 2- or 4-space styles."""
+    width = len(indent.expandtabs(4))
+    while indents and width < indents[-1]:
+        indents.pop()
+    if not indents or width > indents[-1]:
+        indents.append(width)
+    return min(len(indents) - 1, MAX_LEVEL)
+
+
+class _SlideBuilder:
+    def __init__(self):
+        self.slides: List[Dict] = []
+        self._title = ""
+        self._level = 0
+        self._current: Optional[Dict] = None
+        self._top_level_points = 0
+        self.last_point_is_item = False
+        self._dropped_titles: List[str] = []
+
+    def start(self, title: str, level: int):
+        self._close()
+        self._title = title
+        self._level = level
+        self._open(title)
+        self.last_point_is_item = False
+
+    def _slide_for(self, points: bool) -> Dict:
+        current = self._current
+        if current is None:
+            current = self._open(self._title)
+        elif "table" in current or (not points and current["points"]):
+            current = self._open(self._continued())
+        return current
+
+    def _open(self, title: str) -> Dict:
+        self._close()
+        self._current = {"title": title, "points": []}
+        self._top_level_points = 0
+        return self._current
+
+    def add_point(self, text: str, level: int, code: bool = False, item: bool = False):
+        current = self._slide_for(points=True)
+        if level == 0:
+            if self._top_level_points >= MAX_POINTS_PER_SLIDE:
+                current = self._open(self._continued())
+            self._top_level_points += 1
+        point = {"text": text, "level": level}
+        if code:
+            point["code"] = True
+        current["points"].append(point)
+        self.last_point_is_item = item
+
+    def extend_point(self, text: str):
+        point = self._current["points"][-1]
+        point["text"] = f"{point['text']} {text}"
+
+    def add_table(self, rows: List[List[str]]):
+        self._slide_for(points=False)["table"] = rows
+        self.last_point_is_item = False
+
+    def finish(self) -> List[Dict]:
+        self._close()
+        if not self.slides:
+            # Only headings and no content at all: the headings are the deck
+            self.slides = [{"title": title, "points": []} for title in self._dropped_titles]
+        return self.slides
+
+    def _continued(self) -> str:
+        return f"{self._title} (cont.)" if self._title else ""
+
+    def _close(self):
+        current = self._current
+        self._current = None
+        if current is None:
+            return
+        # Empty slides are only kept for top-level headings (title/section slides)
+        if current["points"] or "table" in current or (current["title"] and self._level == 1):
+            self.slides.append(current)
+        elif current["title"]:
+            self._dropped_titles.append(current["title"])
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split prose into sentences, keeping abbreviations and initials together."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        head = text[max(start, match.start() - 12):match.start()].rsplit(None, 1)
+        last_word = head[-1].lower().lstrip("(\"'") if head else ""
+        if match.group().startswith(".") and (
+            last_word in _ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha())
+        ):
+            continue
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def key_phrases(text: str, idf: Dict[str, float], limit: int = 3) -> List[str]:
+    """
+    Top candidate phrases of text: maximal runs of non-stopwords (at most four
+    words), scored by the summed TF-IDF weight of their words.
+    """
+    words = _WORD_RE.findall(text)
+    tf = Counter(word.lower() for word in words)
+    scores = {}
+    run = []
+    for word in words + [""]:
+        lower = word.lower()
+        if word and lower not in _STOPWORDS and not lower[0].isdigit() and len(run) < 4:
+            run.append(word)
+            continue
+        if run:
+            phrase = " ".join(run)
+            key = phrase.lower()
+            if key not in scores:
+                scores[key] = (sum(tf[w.lower()] * idf.get(w.lower(), 1.0) for w in run), phrase)
+            run = []
+        if word and lower not in _STOPWORDS and not lower[0].isdigit():
+            run.append(word)
+    ranked = sorted(scores.values(), key=lambda item: -item[0])
+    return [phrase for _, phrase in ranked[:limit]]
+
+
+def _parse_blocks(text: str) -> List[Dict]:
+    """
+    Single pass over the lines: collect sections of
+    {"title", "level", "items", "paragraphs"} from markdown structure.
+    Fenced code, tables and horizontal rules are skipped.
+    """
+    sections = [_new_section(None, 0)]
+    paragraph = []
+    in_fence = False
+
+    def flush():
+        if paragraph:
+            sections[-1]["paragraphs"].append(_clean(" ".join(paragraph)))
+            paragraph.clear()
+
+    previous_blank = True
+    for line in text.splitlines():
+        if _FENCE_RE.match(line):
+            flush()
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            flush()
+            previous_blank = True
+            continue
+
+        heading = _heading(line)
+        if heading:
+            flush()
+            sections.append(_new_section(_clean(heading[1]), heading[0]))
+        elif _SETEXT_UNDERLINE_RE.match(line) and len(paragraph) == 1:
+            title = _clean(paragraph.pop())
+            sections.append(_new_section(title, 1 if stripped[0] == "=" else 2))
+        elif _RULE_RE.match(line) or _TABLE_ROW_RE.match(line):
+            flush()
+        else:
+            item = _LIST_ITEM_RE.match(line)
+            if item:
+                flush()
+                sections[-1]["items"].append(_clean(item.group(2)))
+            elif sections[-1]["items"] and not previous_blank and not paragraph:
+                # Lazy continuation of the previous list item
+                sections[-1]["items"][-1] = _clean(sections[-1]["items"][-1] + " " + stripped)
+            else:
+                paragraph.append(stripped)
+        previous_blank = False
+    flush()
+
+    return [
+        section for section in sections
+        if section["items"] or section["paragraphs"] or (section["title"] and section["level"] == 1)
+    ]
+
+
+def _new_section(title: Optional[str], level: int) -> Dict:
+    return {"title": title, "level": level, "items": [], "paragraphs": []}
+
+
+def _heading(line: str) -> Optional[Tuple[int, str]]:
+    """(level, text) of an ATX heading line, without its optional closing "#"s."""
+    match = _ATX_HEADING_RE.match(line)
+    if match is None:
+        return None
+    text = match.group(2).rstrip()
+    unclosed = text.rstrip("#")
+    if unclosed != text and unclosed[-1:].isspace():
+        text = unclosed.rstrip()
+    return len(match.group(1)), text
+
+
+def _is_table_divider(cells: str) -> bool:
+    """Whether a table row's inner text (between the outer pipes) is a |---|:--:| divider."""
+    return all(_DIVIDER_CELL_RE.fullmatch(cell.strip()) for cell in cells.split("|"))
+
+
+def _clean(text: str) -> str:
+    # Twice, so a badge image inside a link ([![alt](img)](url)) unwraps fully
+    text = _LINK_RE.sub(r"\1", _LINK_RE.sub(r"\1", text))
+    text = _MARKUP_RE.sub("", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _terms(text: str) -> List[str]:
+    return [
+        word for word in (w.lower() for w in _WORD_RE.findall(text))
+        if word not in _STOPWORDS and not word[0].isdigit()
+    ]
+
+
+def _inverse_document_frequencies(blocks: Iterable[str]) -> Dict[str, float]:
+    """Smoothed IDF of every term, treating each paragraph or list item as a document."""
+    df = Counter()
+    count = 0
+    for block in blocks:
+        df.update(set(_terms(block)))
+        count += 1
+    return {term: math.log((1 + count) / (1 + n)) + 1.0 for term, n in df.items()}
+
+
+def _section_slides(section: Dict, idf: Dict[str, float], focus: Set[str], limit: int) -> List[Dict]:
+    title = section["title"] or None
+    items = section["items"]
+    groups = _sentence_groups(section["paragraphs"], split_paragraphs=title is None)
+
+    if not items and not groups:
+        # A heading alone is still a slide; an empty untitled section is nothing
+        return [{"title": title, "points": []}] if title is not None else []
+
+    slides = []
+    # List items are authored structure: keep all of them, in order
+    for start in range(0, len(items), MAX_POINTS_PER_SLIDE):
+        chunk = items[start:start + MAX_POINTS_PER_SLIDE]
+        slides.append({"title": title if title is not None else _list_title(chunk, idf), "points": [_shorten(item) for item in chunk]})
+
+    # Prose is summarized: each group of sentences yields its best ones
+    for group in groups:
+        group_title = title
+        if group_title is None:
+            group_title, group = _untitled_group_title(group, idf)
+        slides.append({"title": group_title, "points": [_shorten(s) for s in _top_sentences(group, idf, focus, limit)]})
+
+    for index, slide in enumerate(slides):
+        if index and slide["title"] == title:
+            slide["title"] = f"{title} (cont.)"
+    return [slide for slide in slides if slide["points"] or slide["title"]]
+
+
+def _sentence_groups(paragraphs: List[str], split_paragraphs: bool) -> List[List[str]]:
+    """
+    Pack the paragraphs' (de-duplicated) sentences into groups of at most
+    SENTENCES_PER_SLIDE, breaking at paragraph ends where possible. Untitled
+    prose has no other topic boundaries, so there every paragraph of a few
+    sentences starts its own group.
+    """
+    groups = []
+    current = []
+    seen = set()
+    for paragraph in paragraphs:
+        sentences = []
+        for sentence in split_sentences(paragraph):
+            key = sentence.lower()
+            if key not in seen:
+                seen.add(key)
+                sentences.append(sentence)
+        if not sentences:
+            continue
+        if current and (
+            len(current) + len(sentences) > SENTENCES_PER_SLIDE
+            or (split_paragraphs and len(current) >= 3)
+        ):
+            groups.append(current)
+            current = []
+        current.extend(sentences)
+        while len(current) > SENTENCES_PER_SLIDE:
+            groups.append(current[:SENTENCES_PER_SLIDE])
+            current = current[SENTENCES_PER_SLIDE:]
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _top_sentences(sentences: List[str], idf: Dict[str, float], focus: Set[str], limit: int) -> List[str]:
+    """
+    The limit highest-scoring sentences, in their original order. Each
+    guidance (focus) term a sentence contains raises its score.
+    """
+    if len(sentences) <= limit:
+        return sentences
+
+    terms = [_terms(sentence) for sentence in sentences]
+    tf = Counter(term for sentence_terms in terms for term in sentence_terms)
+    scores = []
+    for index, sentence_terms in enumerate(terms):
+        distinct = set(sentence_terms)
+        weight = sum(tf[term] * idf.get(term, 1.0) for term in distinct)
+        weight *= 1 + FOCUS_BOOST * len(distinct & focus)
+        scores.append((weight / math.sqrt(len(distinct) + 1), -index))
+    chosen = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)[:limit]
+    return [sentences[i] for i in sorted(chosen)]
+
+
+def _untitled_group_title(sentences: List[str], idf: Dict[str, float]):
+    """Title for prose without a heading: a short lead sentence, else its top key phrase."""
+    first = sentences[0].rstrip(".:!?")
+    if len(sentences) > 1 and len(first.split()) <= MAX_TITLE_WORDS:
+        return first, sentences[1:]
+    phrases = key_phrases(" ".join(sentences), idf, limit=1)
+    if phrases:
+        return _title_case(phrases[0]), sentences
+    return " ".join(first.split()[:MAX_TITLE_WORDS]), sentences
+
+
+def _list_title(items: List[str], idf: Dict[str, float]) -> str:
+    """Title for list items without a heading: their top key phrase."""
+    phrases = key_phrases(" ".join(items), idf, limit=1)
+    return _title_case(phrases[0]) if phrases else "Key Points"
+
+
+def _title_case(phrase: str) -> str:
+    return " ".join(word if any(c.isupper() for c in word) else word.capitalize() for word in phrase.split())
+
+
+def _shorten(point: str) -> str:
+    if len(point) <= MAX_POINT_CHARS:
+        return point
+    return point[:MAX_POINT_CHARS].rsplit(" ", 1)[0].rstrip(",;:") + "…"
@@ -0,0 +1,97 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from core.clients import key_fingerprint
+from core.llm_handler import DEFAULT_MODELS, generate_slide_content, OFFLINE_PROVIDER
+from core.render_pool import render_pool
+from core.response_cache import normalize_text
+from core.single_flight import deck_flights
+
+
+def deck_key(
+    text_content: str,
+    guidance: str,
+    llm_provider: str,
+    template_analysis: Optional[Dict[str, Any]],
+    long_document: Optional[bool],
+    input_format: str,
+    api_key: str = "",
+) -> str:
+    """
+    Identity of a deck request: text and normalized guidance, provider,
+    model, template hash and a fingerprint of the API key. Callers with
+    different keys never share a generation, so one caller's rejected or
+    rate-limited key (and the offline fallback it causes) cannot reach
+    another. The key is left out when it is never used: offline
+    structuring and explicit markdown input. The text is normalized only
+    when an LLM structures it; markdown mapping and offline structuring
+    read indentation and spacing (nested lists, code blocks), so for those
+    the raw text is hashed.
+    """
+    provider = llm_provider.lower()
+    layout_sensitive = input_format != "text" or provider == OFFLINE_PROVIDER
+    uses_key = provider != OFFLINE_PROVIDER and input_format != "markdown"
+    payload = json.dumps(
+        {
+            "text": text_content if layout_sensitive else normalize_text(text_content),
+            "guidance": normalize_text(guidance).lower(),
+            "provider": provider,
+            "model": DEFAULT_MODELS.get(provider, ""),
+            "template": template_analysis["digest"] if template_analysis else "",
+            "long_document": long_document,
+            "input_format": input_format,
+            "key": key_fingerprint(api_key) if uses_key else "",
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def generate_deck(
+    text_content: str,
+    guidance: str,
+    llm_provider: str,
+    api_key: str,
+    template_analysis: Optional[Dict[str, Any]] = None,
+    long_document: Optional[bool] = None,
+    input_format: str = "text",
+) -> bytes:
+    """
+    Full generation pipeline: structure the text with the LLM, then render
+    the deck against the (optional) analyzed template and return its bytes.
+    Rendering runs on the render pool, off the event loop. Identical
+    requests with the same API key already in flight share one generation
+    and its deck bytes.
+    """
+    return await deck_flights.run(
+        deck_key(text_content, guidance, llm_provider, template_analysis, long_document, input_format, api_key),
+        lambda: _build_deck(text_content, guidance, llm_provider, api_key, template_analysis, long_document, input_format),
+    )
+
+
+async def _build_deck(
+    text_content: str,
+    guidance: str,
+    llm_provider: str,
+    api_key: str,
+    template_analysis: Optional[Dict[str, Any]],
+    long_document: Optional[bool],
+    input_format: str,
+) -> bytes:
+    # 1. Generate structured slide content from LLM
+    slide_data = await generate_slide_content(
+        text_content=text_content,
+        guidance=guidance,
+        llm_provider=llm_provider,
+        api_key=api_key,
+        long_document=long_document,
+        input_format=input_format
+    )
+
+    if not slide_data:
+        raise ValueError("LLM failed to generate slide content.")
+
+    # 2. Create PPT with template styling
+    return await render_pool.render(slide_data, template_analysis)
@@ -0,0 +1,190 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Mapping, Optional, Tuple
+
+from core.config import env_int
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Rate-limit response headers: (limit, remaining, reset) per dimension
+_HEADERS = {
+    "openai": {
+        "requests": ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+        "tokens": ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+    },
+    "anthropic": {
+        "requests": ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-reset"),
+        "tokens": ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-tokens-reset"),
+    },
+}
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough token cost of a call: ~4 characters per prompt token plus the completion budget."""
+    return len(prompt) // 4 + max_tokens
+
+
+def _seconds_until(reset: str) -> Optional[float]:
+    """Parse a reset header: an OpenAI duration ("1m30s", "6ms") or an RFC 3339 time."""
+    parts = _DURATION_RE.findall(reset)
+    if parts and "".join(value + unit for value, unit in parts) == reset:
+        return sum(float(value) * _DURATION_UNITS[unit] for value, unit in parts)
+    try:
+        return max(0.0, datetime.fromisoformat(reset.replace("Z", "+00:00")).timestamp() - time.time())
+    except ValueError:
+        return None
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously; a limit of 0 means unlimited."""
+
+    def __init__(self, per_minute: float):
+        self.limit = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.limit:
+            self.level = min(self.limit, self.level + (now - self.updated) * self.limit / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (requests above the limit only need a full bucket)."""
+        if not self.limit:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.limit) - self.level
+        return missing * 60 / self.limit if missing > 0 else 0.0
+
+    def take(self, amount: float):
+        if self.limit:
+            self.level -= min(amount, self.limit)
+
+    def adjust(self, limit: Optional[float], remaining: Optional[float], now: float):
+        """Adopt the provider's reported limit and never assume more headroom than it reports."""
+        self._refill(now)
+        if limit:
+            self.level = self.level * limit / self.limit if self.limit else limit
+            self.limit = limit
+        if remaining is not None and self.limit:
+            self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for one provider and
+    API key. Callers queue in arrival order until both budgets allow them.
+    """
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self._gate: Optional[tuple] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a caller holds or is queued for this limiter (the lock is held while waiting)."""
+        return self._gate is not None and self._gate[1].locked()
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._gate is None or self._gate[0] is not loop:
+            self._gate = (loop, asyncio.Lock())
+        return self._gate[1]
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until one request of about tokens tokens fits; returns the seconds waited."""
+        start = time.monotonic()
+        async with self._lock():
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return now - start
+                await asyncio.sleep(wait)
+
+    def update(self, provider: str, status: int, headers: Mapping[str, str]):
+        now = time.monotonic()
+        resets = []
+        for dimension, (limit, remaining, reset) in _HEADERS.get(provider, {}).items():
+            getattr(self, dimension).adjust(_header_float(headers, limit), _header_float(headers, remaining), now)
+            if headers.get(reset):
+                resets.append(_seconds_until(headers[reset]))
+        if status == 429:
+            # Hold everyone back until the provider says the window has reset
+            retry_after = _header_float(headers, "retry-after")
+            pause = retry_after if retry_after is not None else max((r for r in resets if r is not None), default=1.0)
+            self.paused_until = max(self.paused_until, now + pause)
+
+
+class RateLimits:
+    """
+    Limiters keyed by provider and API-key hash, bounded LRU. Busy limiters
+    are never evicted, so queued callers keep their FIFO order and the
+    budget learned from response headers; while every limiter is busy the
+    map may briefly exceed max_size.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._limiters: "OrderedDict[Tuple[str, str], RateLimiter]" = OrderedDict()
+
+    def limiter(self, provider: str, fingerprint: str) -> RateLimiter:
+        key = (provider, fingerprint)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = RateLimiter(
+                env_int(f"LLM_RPM_{provider.upper()}", DEFAULT_RPM),
+                env_int(f"LLM_TPM_{provider.upper()}", DEFAULT_TPM),
+            )
+            self._evict()
+        else:
+            self._limiters.move_to_end(key)
+        return limiter
+
+    def _evict(self):
+        excess = len(self._limiters) - self.max_size
+        if excess <= 0:
+            return
+        idle = []
+        for key, limiter in self._limiters.items():
+            if len(idle) == excess:
+                break
+            if not limiter.busy:
+                idle.append(key)
+        for key in idle:
+            del self._limiters[key]
+
+    async def acquire(self, provider: str, fingerprint: str, tokens: int) -> float:
+        return await self.limiter(provider, fingerprint).acquire(tokens)
+
+    def observe(self, provider: str, fingerprint: str, status: int, headers: Mapping[str, str]):
+        """Feed a provider response's rate-limit headers back into its limiter."""
+        self.limiter(provider, fingerprint).update(provider, status, headers)
+
+
+# Starting budgets per provider and key until response headers report the real ones.
+# Override per provider with e.g. LLM_RPM_OPENAI; 0 means unlimited.
+DEFAULT_RPM = env_int("LLM_RPM", 500)
+DEFAULT_TPM = env_int("LLM_TPM", 200000)
+
+rate_limits = RateLimits(max_size=env_int("LLM_RATE_LIMITERS_MAX", 1024))
@@ -0,0 +1,158 @@
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from core.config import env_int, env_str
+from core.generator import create_ppt_from_template, get_template_analysis
+from core.metrics import collect_spans, record_spans, span
+from core.template_cache import template_cache
+from core.template_store import TemplateStore, template_store
+
+
+def _init_worker(store_dir: str, prewarm_templates: int):
+    """
+    Process-pool initializer: import python-pptx, warm lxml with a tiny
+    render, and load the most recently used registered templates into this
+    worker's own template cache.
+    """
+    create_ppt_from_template([{"title": "warm-up", "points": ["warm-up"]}], io.BytesIO())
+    if not store_dir or prewarm_templates <= 0:
+        return
+
+    store = TemplateStore(store_dir, max_bytes=1 << 62, ttl=float("inf"))
+    for template_id in store.template_ids()[:prewarm_templates]:
+        try:
+            get_template_analysis(store.get_bytes(template_id), digest=template_id)
+        except Exception as e:
+            print(f"Could not pre-warm template {template_id}: {e}")
+
+
+def _render_in_worker(slide_data: List[Dict], digest: Optional[str], template_analysis: Optional[Dict[str, Any]]):
+    """
+    Render a deck and return its bytes.
+    Templates are referenced by digest; returns None if this worker has not
+    seen the template yet and it was not sent along, so the caller can retry
+    with the full analysis (which the worker then keeps).
+    """
+    if digest is not None:
+        if template_analysis is None:
+            template_analysis = template_cache.get(digest)
+            if template_analysis is None:
+                return None
+        else:
+            template_cache.put(digest, template_analysis)
+
+    output = io.BytesIO()
+    create_ppt_from_template(slide_data, output, template_analysis=template_analysis)
+    return output.getvalue()
+
+
+def _render_in_process(slide_data: List[Dict], digest: Optional[str], template_analysis: Optional[Dict[str, Any]]):
+    """_render_in_worker for worker processes: also returns the stage spans measured there."""
+    with collect_spans() as spans:
+        deck = _render_in_worker(slide_data, digest, template_analysis)
+    return deck, spans
+
+
+class RenderPool:
+    """
+    Executor for CPU-bound python-pptx rendering.
+    backend is "process" (a pool of worker processes, so renders scale across
+    cores instead of serializing on the GIL), "thread" (off the event loop but
+    GIL-bound) or "inline" (on the event loop). At most max_pending renders
+    are queued or running; further callers wait for a slot.
+    """
+
+    def __init__(self, backend: str = "process", workers: int = 1, max_pending: int = 4,
+                 start_method: str = "spawn", store_dir: str = "", prewarm_templates: int = 0):
+        if backend not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown render backend: {backend}")
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.start_method = start_method
+        self.store_dir = store_dir
+        self.prewarm_templates = prewarm_templates
+        self._executor = None
+        self._gate = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.backend == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.store_dir, self.prewarm_templates),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+        return self._executor
+
+    def _get_gate(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._gate is None or self._gate[0] is not loop:
+            self._gate = (loop, asyncio.Semaphore(self.max_pending))
+        return self._gate[1]
+
+    def start(self):
+        """Create the executor (and start worker processes) ahead of the first render."""
+        if self.backend == "inline":
+            return
+        executor = self._get_executor()
+        if self.backend == "process":
+            # Spin every worker up now so initializers run before traffic arrives
+            for future in [executor.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+
+    async def render(self, slide_data: List[Dict], template_analysis: Optional[Dict[str, Any]] = None) -> bytes:
+        """Render slide_data against the analyzed template and return the deck bytes."""
+        if self.backend == "inline":
+            with span("render"):
+                return _render_in_worker(slide_data, None, template_analysis)
+
+        with span("render_wait"):
+            await self._get_gate().acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                with span("render"):
+                    if self.backend == "thread":
+                        return await loop.run_in_executor(executor, _render_in_worker, slide_data, None, template_analysis)
+
+                    digest = template_analysis["digest"] if template_analysis else None
+                    deck, spans = await loop.run_in_executor(executor, _render_in_process, slide_data, digest, None)
+                    if deck is None:
+                        deck, spans = await loop.run_in_executor(
+                            executor, _render_in_process, slide_data, digest, template_analysis)
+                    record_spans(spans)
+                    return deck
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for the next render
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        finally:
+            self._get_gate().release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+RENDER_WORKERS = env_int("RENDER_WORKERS", os.cpu_count() or 1)
+
+render_pool = RenderPool(
+    backend=env_str("RENDER_BACKEND", "process"),
+    workers=RENDER_WORKERS,
+    max_pending=env_int("RENDER_QUEUE_MAX", RENDER_WORKERS * 4),
+    start_method=env_str("RENDER_START_METHOD", "spawn"),
+    store_dir=template_store.root,
+    prewarm_templates=env_int("RENDER_PREWARM_TEMPLATES", 8),
+)
@@ -0,0 +1,124 @@
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from core.config import env_float, env_int, env_str
+
+_INLINE_SPACE_RE = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+CACHE_FORMAT_VERSION = 1
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form of an input, so trivially different resubmits share a key."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def cache_key(text_content: str, guidance: str, provider: str, model: str, mode: str = "") -> str:
+    """
+    Hash of the normalized prompt inputs plus provider and model.
+    The API key is deliberately not part of the key and is never stored.
+    """
+    payload = json.dumps(
+        {
+            "v": CACHE_FORMAT_VERSION,
+            "text": normalize_text(text_content),
+            "guidance": normalize_text(guidance).lower(),
+            "provider": provider.lower(),
+            "model": model,
+            "mode": mode,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of structured slide lists.
+    An in-memory LRU tier answers repeat requests on this worker; an optional
+    sqlite tier (db_path) shares results across workers and restarts. Both
+    tiers expire entries after ttl seconds.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 86400.0, db_path: str = ""):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS slide_cache ("
+                "key TEXT PRIMARY KEY, slides TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    return copy.deepcopy(entry[0])
+                del self._memory[key]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT slides, expires_at FROM slide_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM slide_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            slides = json.loads(row[0])
+            self._remember(key, slides, row[1])
+            return copy.deepcopy(slides)
+
+    def set(self, key: str, slides: List[Dict]):
+        expires_at = time.time() + self.ttl
+        slides = copy.deepcopy(slides)
+        with self._lock:
+            self._remember(key, slides, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO slide_cache (key, slides, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(slides, ensure_ascii=False), expires_at),
+                )
+                self._db.execute("DELETE FROM slide_cache WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+
+    def _remember(self, key: str, slides: List[Dict], expires_at: float):
+        self._memory[key] = (slides, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM slide_cache")
+                self._db.commit()
+
+
+response_cache = ResponseCache(
+    max_entries=env_int("LLM_CACHE_MAX_ENTRIES", 1024),
+    ttl=env_float("LLM_CACHE_TTL", 86400.0),
+    db_path=env_str("LLM_CACHE_DB"),
+)
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from core.metrics import SINGLE_FLIGHT
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicates identical concurrent work.
+    The first caller for a key starts the computation; callers arriving while
+    it is in flight await the same task and get the same result (or error).
+    The task is shielded, so one caller disconnecting does not cancel it for
+    the others.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._flights)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._flights.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            SINGLE_FLIGHT.inc(result="leader")
+            task = asyncio.ensure_future(factory())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            SINGLE_FLIGHT.inc(result="joined")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Nobody may be left to observe a failure; retrieve it so it is not logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+
+deck_flights = SingleFlight()
@@ -0,0 +1,260 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Characters that can change parser state outside and inside JSON strings
+_STRUCTURAL_RE = re.compile(r'[\[\]{}"]')
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+_DECODER = json.JSONDecoder()
+
+# The one schema every provider's structured output is constrained to. Points
+# are plain strings here; normalize_slide also accepts richer points.
+SLIDE_DECK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "slides": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "points": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["title", "points"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["slides"],
+    "additionalProperties": False,
+}
+
+
+class IncrementalSlideParser:
+    """
+    Incremental parser for a JSON array of slide objects arriving in pieces.
+    feed() returns every slide object that closed in the new text, so slides
+    can be rendered while the rest of the completion is still streaming.
+    The first "[" seen opens the slide array, which also covers wrappers
+    such as {"slides": [...]}. Text before it (prose, code fences) is ignored,
+    and so is a bracketed aside such as "[2]": an array that closes without
+    yielding a slide is dropped and the search for the slide array resumes.
+    The scan only stops at brackets and quotes and never revisits text, so
+    parsing is linear in the input.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None
+        self._object_start = None
+        self._array_slides = 0
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        slides = []
+        if self.done or not chunk:
+            return slides
+
+        buf = self._buffer + chunk
+        i = self._pos
+        length = len(buf)
+        while i < length:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                match = _STRING_SPECIAL_RE.search(buf, i)
+                if match is None:
+                    i = length
+                    break
+                i = match.start()
+                if buf[i] == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                i += 1
+                continue
+
+            # Skip straight to the next bracket or quote
+            match = _STRUCTURAL_RE.search(buf, i)
+            if match is None:
+                i = length
+                break
+            i = match.start()
+            ch = buf[i]
+            if ch == '"':
+                # Quotes only matter once we are inside JSON
+                if self._depth:
+                    self._in_string = True
+            elif ch == "[" or ch == "{":
+                self._depth += 1
+                if self._array_depth is None:
+                    if ch == "[":
+                        self._array_depth = self._depth
+                elif ch == "{" and self._depth == self._array_depth + 1:
+                    # Well-formed, complete objects decode in one step
+                    try:
+                        value, end = _DECODER.raw_decode(buf, i)
+                    except json.JSONDecodeError:
+                        # Unfinished or malformed: scan to its closing brace
+                        self._object_start = i
+                    else:
+                        slide = _check_slide(value)
+                        if slide is not None:
+                            slides.append(slide)
+                            self._array_slides += 1
+                        self._depth -= 1
+                        i = end
+                        continue
+            elif ch == "]" or ch == "}":
+                if self._array_depth is not None:
+                    if ch == "}" and self._object_start is not None and self._depth == self._array_depth + 1:
+                        slide = _load_object(buf[self._object_start:i + 1])
+                        if slide is not None:
+                            slides.append(slide)
+                            self._array_slides += 1
+                        self._object_start = None
+                    elif ch == "]" and self._depth == self._array_depth:
+                        self._depth -= 1
+                        i += 1
+                        if self._array_slides:
+                            self.done = True
+                            break
+                        # Not the slide array after all; keep looking
+                        self._array_depth = None
+                        self._depth = 0
+                        continue
+                self._depth = max(0, self._depth - 1)
+            i += 1
+
+        # Keep only the text we may still need: an unfinished slide object
+        keep = self._object_start if self._object_start is not None else i
+        self._buffer = buf[keep:]
+        self._pos = i - keep
+        if self._object_start is not None:
+            self._object_start = 0
+        return slides
+
+
+def extract_slides(content: str) -> Tuple[List[Dict], bool]:
+    """
+    Pull the slide objects out of a complete LLM response in a single pass.
+    Returns (slides, complete); complete is False when the array never
+    closed, e.g. a response cut off at max_tokens, in which case the slides
+    that did finish are still returned.
+    """
+    parser = IncrementalSlideParser()
+    slides = parser.feed(content)
+    return slides, parser.done
+
+
+def slides_from_payload(payload: Any) -> List[Dict]:
+    """
+    Slides from schema-constrained output: a decoded {"slides": [...]} object
+    (or a bare list of slides). Entries failing the slide schema are dropped.
+    """
+    slides = payload.get("slides") if isinstance(payload, dict) else payload
+    if not isinstance(slides, list):
+        raise ValueError("Structured response has no slides array")
+    return [slide for slide in map(normalize_slide, slides) if slide is not None]
+
+
+def normalize_slide(value: Any) -> Optional[Dict]:
+    """
+    Check a decoded object against the slide schema and return it in
+    canonical form: {"title": str, "points": [str | {"text", "level", ...}]}
+    plus an optional "table" of string rows. Returns None if it is not a slide.
+    """
+    if not isinstance(value, dict):
+        return None
+    title = value.get("title")
+    title = "" if title is None else str(title).strip()
+    points = value.get("points", [])
+    if isinstance(points, str):
+        points = [line for line in points.splitlines()]
+    if not isinstance(points, list):
+        return None
+
+    clean_points = []
+    for point in points:
+        if isinstance(point, dict):
+            text = str(point.get("text", "")).strip()
+            if text:
+                clean = dict(point, text=text)
+                if "level" in clean:
+                    try:
+                        clean["level"] = int(clean["level"])
+                    except (TypeError, ValueError):
+                        clean["level"] = 0
+                clean_points.append(clean)
+        elif point is not None and not isinstance(point, (list, bool)):
+            text = str(point).strip()
+            if text:
+                clean_points.append(text)
+
+    if not title and not clean_points:
+        return None
+    slide = {"title": title, "points": clean_points}
+    table = value.get("table")
+    if isinstance(table, list) and table and all(isinstance(row, list) for row in table):
+        slide["table"] = [[str(cell) for cell in row] for row in table]
+    return slide
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing } or ] (outside strings), in one pass."""
+    out = []
+    pending_comma = None
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == ",":
+            if pending_comma is not None:
+                out.append(pending_comma)
+            pending_comma = ch
+            continue
+        elif ch.isspace() and pending_comma is not None:
+            pending_comma += ch
+            continue
+        elif ch == '"':
+            in_string = True
+        if pending_comma is not None:
+            if ch not in "}]":
+                out.append(pending_comma)
+            else:
+                out.append(pending_comma[1:])
+            pending_comma = None
+        out.append(ch)
+    if pending_comma is not None:
+        out.append(pending_comma)
+    return "".join(out)
+
+
+def _load_object(text: str):
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            value = json.loads(strip_trailing_commas(text))
+        except json.JSONDecodeError as e:
+            print(f"Skipping malformed slide object: {e}")
+            return None
+    return _check_slide(value)
+
+
+def _check_slide(value):
+    slide = normalize_slide(value)
+    if slide is None:
+        print("Skipping object that does not match the slide schema")
+    return slide
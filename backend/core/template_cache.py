@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from core.config import env_int
+from core.metrics import TEMPLATE_CACHE
+
+
+class TemplateCache:
+    """
+    Content-addressed LRU cache of parsed template analyses.
+    Entries are keyed by the SHA-256 of the template bytes and bounded by both
+    an entry count and an approximate memory budget (each analysis reports its
+    own "size" in bytes).
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, digest: str):
+        return digest in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            analysis = self._entries.get(digest)
+            if analysis is not None:
+                self._entries.move_to_end(digest)
+        TEMPLATE_CACHE.inc(result="miss" if analysis is None else "hit")
+        return analysis
+
+    def put(self, digest: str, analysis: Dict[str, Any]):
+        size = analysis.get("size", 0)
+        if size > self.max_bytes:
+            # Too big to ever fit; callers still get the analysis, it just isn't kept.
+            return
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self._total_bytes -= previous.get("size", 0)
+            self._entries[digest] = analysis
+            self._total_bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.get("size", 0)
+
+    def get_or_create(self, digest: str, factory: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached analysis for digest, building it with factory on a miss."""
+        analysis = self.get(digest)
+        if analysis is None:
+            analysis = factory()
+            self.put(digest, analysis)
+        return analysis
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+template_cache = TemplateCache(
+    max_entries=env_int("TEMPLATE_CACHE_MAX_ENTRIES", 64),
+    max_bytes=env_int("TEMPLATE_CACHE_MAX_BYTES", 256 * 1024 * 1024),
+)
@@ -0,0 +1,143 @@
+import os
+import re
+import tempfile
+import threading
+import time
+
+from core.config import env_float, env_int, env_str
+
+_TEMPLATE_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class TemplateNotFound(KeyError):
+    """Raised when a template ID is unknown or has expired."""
+
+
+class TemplateStore:
+    """
+    Local-disk store for registered templates.
+    Templates are content-addressed (the ID is the SHA-256 of the bytes), so
+    registering the same file twice returns the same ID. Entries expire after
+    ttl seconds without use, and the least recently used entries are evicted
+    when the total size would exceed max_bytes.
+    """
+
+    def __init__(self, root: str, max_bytes: int, ttl: float):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, template_id: str) -> str:
+        if not _TEMPLATE_ID_RE.match(template_id or ""):
+            raise TemplateNotFound(template_id)
+        return os.path.join(self.root, f"{template_id}.pptx")
+
+    def put(self, template_id: str, template_bytes: bytes) -> str:
+        """Store template bytes under their content hash and return the ID."""
+        if len(template_bytes) > self.max_bytes:
+            raise ValueError("Template is larger than the template store quota.")
+
+        path = self._path(template_id)
+        with self._lock:
+            if os.path.exists(path):
+                os.utime(path)
+                return template_id
+
+            self._make_room(len(template_bytes))
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(template_bytes)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return template_id
+
+    def touch(self, template_id: str):
+        """Mark a template as used, extending its TTL. Raises if it is gone."""
+        path = self._path(template_id)
+        if not self._is_live(path):
+            raise TemplateNotFound(template_id)
+        os.utime(path)
+
+    def get_bytes(self, template_id: str) -> bytes:
+        """Read a stored template. Raises TemplateNotFound if unknown or expired."""
+        path = self._path(template_id)
+        if not self._is_live(path):
+            raise TemplateNotFound(template_id)
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+        return data
+
+    def delete(self, template_id: str):
+        path = self._path(template_id)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            raise TemplateNotFound(template_id)
+
+    def template_ids(self):
+        """IDs of all live templates, most recently used first."""
+        now = time.time()
+        entries = [entry for entry in self._entries() if now - entry[1] <= self.ttl]
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        return [os.path.basename(path)[:-len(".pptx")] for path, _, _ in entries]
+
+    def _is_live(self, path: str) -> bool:
+        try:
+            mtime = os.path.getmtime(path)
+        except FileNotFoundError:
+            return False
+        if time.time() - mtime > self.ttl:
+            self._remove_quietly(path)
+            return False
+        return True
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".pptx"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _make_room(self, incoming: int):
+        """Drop expired templates, then LRU ones, until incoming bytes fit the quota."""
+        now = time.time()
+        live = []
+        for path, mtime, size in self._entries():
+            if now - mtime > self.ttl:
+                self._remove_quietly(path)
+            else:
+                live.append((path, mtime, size))
+
+        live.sort(key=lambda entry: entry[1])
+        total = sum(size for _, _, size in live)
+        while live and total + incoming > self.max_bytes:
+            path, _, size = live.pop(0)
+            self._remove_quietly(path)
+            total -= size
+
+    @staticmethod
+    def _remove_quietly(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+template_store = TemplateStore(
+    root=env_str("TEMPLATE_STORE_DIR") or os.path.join(tempfile.gettempdir(), "ppt_templates"),
+    max_bytes=env_int("TEMPLATE_STORE_MAX_BYTES", 1024 * 1024 * 1024),
+    ttl=env_float("TEMPLATE_STORE_TTL", 7 * 24 * 3600),
+)
@@ -0,0 +1,95 @@
+import hashlib
+import io
+import xml.etree.ElementTree as ET
+import zipfile
+import zlib
+from typing import Tuple
+
+from core.config import env_int
+
+# Largest template upload accepted, and the most its parts may inflate to
+MAX_TEMPLATE_BYTES = env_int("TEMPLATE_MAX_BYTES", 50 * 1024 * 1024)
+MAX_TEMPLATE_UNCOMPRESSED_BYTES = env_int("TEMPLATE_MAX_UNCOMPRESSED_BYTES", 512 * 1024 * 1024)
+# Largest request body accepted: a full-size template plus the form's text fields
+MAX_REQUEST_BYTES = env_int("REQUEST_MAX_BYTES", MAX_TEMPLATE_BYTES + 16 * 1024 * 1024)
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+_CONTENT_TYPES_PART = "[Content_Types].xml"
+_CONTENT_TYPES_MAX_BYTES = 1024 * 1024
+_CONTENT_TYPES_NS = "{http://schemas.openxmlformats.org/package/2006/content-types}"
+# Main-part content types of .pptx/.potx/.ppsx, with or without macros
+_MAIN_CONTENT_TYPES = {
+    f"application/vnd.{vendor}.presentationml.{kind}.main+xml"
+    for vendor, kinds in (
+        ("openxmlformats-officedocument", ("presentation", "template", "slideshow")),
+        ("ms-powerpoint", ("presentation.macroEnabled", "template.macroEnabled", "slideshow.macroEnabled")),
+    )
+    for kind in kinds
+}
+
+
+class InvalidTemplate(ValueError):
+    """The upload is not a usable PowerPoint template."""
+
+
+class TemplateTooLarge(InvalidTemplate):
+    """The upload exceeds MAX_TEMPLATE_BYTES."""
+
+
+async def read_template_upload(upload, max_bytes: int = MAX_TEMPLATE_BYTES) -> Tuple[bytes, str]:
+    """
+    Read an uploaded template in chunks, hashing as it goes, and stop as soon
+    as it exceeds max_bytes. Returns (bytes, SHA-256 hex digest). The client's
+    file name is never used.
+    """
+    size = getattr(upload, "size", None)
+    if size is not None and size > max_bytes:
+        raise TemplateTooLarge(f"Template is larger than {max_bytes} bytes.")
+
+    digest = hashlib.sha256()
+    buffer = io.BytesIO()
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        if buffer.tell() + len(chunk) > max_bytes:
+            raise TemplateTooLarge(f"Template is larger than {max_bytes} bytes.")
+        digest.update(chunk)
+        buffer.write(chunk)
+    return buffer.getvalue(), digest.hexdigest()
+
+
+def check_template_package(template_bytes: bytes):
+    """
+    Cheap structural checks before python-pptx parses the whole package:
+    a readable ZIP central directory with a bounded inflated size, and a
+    [Content_Types].xml that declares a PowerPoint main part.
+    """
+    if not template_bytes.startswith(b"PK\x03\x04"):
+        raise InvalidTemplate("Template is not a .pptx or .potx file.")
+    try:
+        package = zipfile.ZipFile(io.BytesIO(template_bytes))
+    except (zipfile.BadZipFile, ValueError) as e:
+        raise InvalidTemplate(f"Template is not a valid ZIP package: {e}")
+
+    with package:
+        infos = package.infolist()
+        if sum(info.file_size for info in infos) > MAX_TEMPLATE_UNCOMPRESSED_BYTES:
+            raise InvalidTemplate("Template expands to more than the allowed size.")
+        try:
+            content_types = package.getinfo(_CONTENT_TYPES_PART)
+        except KeyError:
+            raise InvalidTemplate(f"Template has no {_CONTENT_TYPES_PART}.")
+        if content_types.file_size > _CONTENT_TYPES_MAX_BYTES:
+            raise InvalidTemplate(f"Template's {_CONTENT_TYPES_PART} is too large.")
+        try:
+            root = ET.fromstring(package.read(content_types))
+        except (ET.ParseError, zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError) as e:
+            raise InvalidTemplate(f"Template's {_CONTENT_TYPES_PART} is unreadable: {e}")
+
+    declared = {
+        override.get("ContentType")
+        for override in root.iter(f"{_CONTENT_TYPES_NS}Override")
+    }
+    if not declared & _MAIN_CONTENT_TYPES:
+        raise InvalidTemplate("Template does not contain a PowerPoint presentation.")
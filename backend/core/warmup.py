@@ -0,0 +1,44 @@
+import io
+import time
+from typing import Callable, Dict
+
+from core.clients import ENABLED_PROVIDERS, import_provider
+from core.config import env_int
+from core.generator import create_basic_presentation
+from core.metrics import STARTUP_SECONDS
+from core.render_pool import render_pool
+
+# Set WARMUP=0 to skip the start-up warm-up and pay these costs on first use instead
+WARMUP = env_int("WARMUP", 1) > 0
+
+
+def _timed(timings: Dict[str, float], step: str, work: Callable[[], object]):
+    start = time.perf_counter()
+    try:
+        work()
+    except Exception as e:
+        print(f"Warm-up step {step} failed: {e}")
+    timings[step] = time.perf_counter() - start
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Pay cold-start costs before traffic arrives: import the SDK of each
+    enabled provider, build one default-theme deck (loading python-pptx's
+    default template, lxml and the basic stamp plan) and start the render
+    workers. Returns seconds per step, which are also logged and exported
+    as ppt_startup_duration_seconds.
+    """
+    timings: Dict[str, float] = {}
+    for provider in ENABLED_PROVIDERS:
+        _timed(timings, f"import_{provider}", lambda: import_provider(provider))
+    _timed(
+        timings, "default_template",
+        lambda: create_basic_presentation([{"title": "warm-up", "points": ["warm-up"]}], io.BytesIO()),
+    )
+    _timed(timings, "render_workers", render_pool.start)
+
+    for step, seconds in timings.items():
+        STARTUP_SECONDS.observe(seconds, step=step)
+    print("Warm-up: " + ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in timings.items()))
+    return timings
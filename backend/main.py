@@ -1,17 +1,84 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import os
-import shutil
-import tempfile
-from typing import Optional
+from starlette.background import BackgroundTask
+import asyncio
+import io
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from urllib.parse import quote
 
-from core.llm_handler import generate_slide_content
-from core.generator import create_ppt_from_template
+from core.batch import manifest_entry, render_batch, safe_document_names, safe_filename, stream_zip
+from core.clients import client_registry, ENABLED_PROVIDERS
+from core.config import env_int
+from core.generator import DeckBuilder, get_template_analysis
+from core.jobs import job_manager, job_status, QueueFull, ResultBudgetFull
+from core.llm_handler import OFFLINE_PROVIDER, requires_api_key, stream_slide_content
+from core.offline import EmptyMarkdown, INPUT_FORMATS
+from core.metrics import HTTP_REQUEST_SECONDS, registry, span
+from core.pipeline import generate_deck
+from core.render_pool import render_pool
+from core.template_cache import template_cache
+from core.template_store import template_store, TemplateNotFound
+from core.uploads import check_template_package, InvalidTemplate, MAX_REQUEST_BYTES, read_template_upload, TemplateTooLarge
+from core.warmup import warm_up, WARMUP
 
-app = FastAPI(title="Text to PowerPoint Generator")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up and start background workers before serving; stop them on shutdown."""
+    if WARMUP:
+        await asyncio.to_thread(warm_up)
+    job_manager.start()
+    try:
+        yield
+    finally:
+        await job_manager.shutdown()
+        await asyncio.to_thread(render_pool.shutdown)
+        await client_registry.aclose()
+
+app = FastAPI(title="Text to PowerPoint Generator", lifespan=lifespan)
+
+class RequestSizeLimit:
+    """
+    Reject request bodies over max_bytes before they are parsed, so an
+    oversized upload is never spooled to memory or disk: up front from
+    Content-Length, otherwise as soon as the streamed bytes pass the limit.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body is larger than {self.max_bytes} bytes."
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+# Innermost middleware, so CORS headers and request timing still apply to its 413s
+app.add_middleware(RequestSizeLimit, max_bytes=MAX_REQUEST_BYTES)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,70 +88,388 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def cleanup_directory(path: str):
-    """Function to remove a directory and its contents."""
-    print(f"Cleaning up temporary directory: {path}")
-    shutil.rmtree(path)
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Record request latency per route template (not per raw path, to keep label cardinality bounded)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status,
+        )
+
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+def pptx_response(deck: bytes, filename: str) -> Response:
+    """Send a finished deck to the client as an attachment, straight from its bytes."""
+    return Response(
+        content=deck,
+        media_type=PPTX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}"},
+    )
+
+async def read_uploaded_template(template_file: UploadFile):
+    """
+    Read and structurally check an uploaded template, answering 413 when it
+    is too large and 422 when it is not a PowerPoint package.
+    Returns (template_bytes, digest).
+    """
+    try:
+        with span("upload_copy"):
+            template_bytes, digest = await read_template_upload(template_file)
+        check_template_package(template_bytes)
+    except TemplateTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidTemplate as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return template_bytes, digest
+
+async def analyze_uploaded_template(template_file: UploadFile):
+    """
+    Analyze an uploaded template in memory, off the event loop, rejecting
+    unusable ones with a 4xx.
+    """
+    template_bytes, digest = await read_uploaded_template(template_file)
+    try:
+        return await asyncio.to_thread(get_template_analysis, template_bytes, digest=digest)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Could not read template: {str(e)}")
+
+def check_input_format(input_format: str):
+    if input_format not in INPUT_FORMATS:
+        raise HTTPException(status_code=422, detail=f"input_format must be one of: {', '.join(INPUT_FORMATS)}")
+
+def check_llm_provider(llm_provider: str):
+    """Refuse providers that are unknown or not in ENABLED_PROVIDERS before any work starts."""
+    if llm_provider.lower() not in ENABLED_PROVIDERS + (OFFLINE_PROVIDER,):
+        raise HTTPException(
+            status_code=400,
+            detail=f"llm_provider must be one of: {', '.join(ENABLED_PROVIDERS + (OFFLINE_PROVIDER,))}",
+        )
+
+def check_api_key(api_key: str, text_contents: List[str], guidance: str, llm_provider: str, input_format: str):
+    """Require an API key up front whenever some document will be structured by an LLM."""
+    if not api_key and any(requires_api_key(text, guidance, llm_provider, input_format) for text in text_contents):
+        raise HTTPException(
+            status_code=422,
+            detail=f"api_key is required for {llm_provider} unless llm_provider is {OFFLINE_PROVIDER} or the input is mapped as markdown",
+        )
+
+async def load_registered_template(template_id: str):
+    """
+    Return the analysis for a registered template.
+    Served from the in-memory cache when possible, so known templates cost no
+    upload and no disk read; otherwise the stored file is read and
+    re-analyzed in a worker thread.
+    """
+    try:
+        analysis = template_cache.get(template_id)
+        if analysis is not None:
+            template_store.touch(template_id)
+            return analysis
+        return await asyncio.to_thread(
+            lambda: get_template_analysis(template_store.get_bytes(template_id), digest=template_id)
+        )
+    except TemplateNotFound:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired template_id: {template_id}")
+
+@app.post("/templates")
+async def register_template(template_file: UploadFile = File(...)):
+    """Store and pre-analyze a template so later decks can reference it by ID."""
+    template_bytes, template_id = await read_uploaded_template(template_file)
+    
+    try:
+        await asyncio.to_thread(get_template_analysis, template_bytes, digest=template_id)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Could not read template: {str(e)}")
+    
+    try:
+        await asyncio.to_thread(template_store.put, template_id, template_bytes)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    return {
+        "template_id": template_id,
+        "size": len(template_bytes),
+        "expires_in": int(template_store.ttl),
+    }
+
+@app.delete("/templates/{template_id}")
+def delete_template(template_id: str):
+    """Remove a registered template."""
+    try:
+        template_store.delete(template_id)
+    except TemplateNotFound:
+        raise HTTPException(status_code=404, detail=f"Unknown template_id: {template_id}")
+    return {"template_id": template_id, "deleted": True}
 
 @app.post("/generate-ppt")
 async def generate_ppt(
-    background_tasks: BackgroundTasks, # Add this dependency
     text_content: str = Form(...),
     guidance: str = Form(""),
     llm_provider: str = Form(...),
-    api_key: str = Form(...),
+    api_key: str = Form(""),
     filename: str = Form(...),
-    template_file: Optional[UploadFile] = File(None)
+    template_file: Optional[UploadFile] = File(None),
+    template_id: Optional[str] = Form(None),
+    long_document: Optional[bool] = Form(None),
+    input_format: str = Form("text")
 ):
-    # Create a temporary directory without a 'with' block
-    temp_dir = tempfile.mkdtemp()
+    check_input_format(input_format)
+    check_llm_provider(llm_provider)
+    check_api_key(api_key, [text_content], guidance, llm_provider, input_format)
+    
+    # Resolve and validate the template before doing any other work
+    template_analysis = await load_registered_template(template_id) if template_id else None
+    if template_file and template_analysis is None:
+        template_analysis = await analyze_uploaded_template(template_file)
     
     try:
-        template_path = None
-        if template_file:
-            template_path = os.path.join(temp_dir, template_file.filename)
-            with open(template_path, "wb") as buffer:
-                shutil.copyfileobj(template_file.file, buffer)
-        
-        # 1. Generate structured slide content from LLM
-        slide_data = generate_slide_content(
+        # 1-2. Structure the text with the LLM and render the deck
+        deck = await generate_deck(
             text_content=text_content,
             guidance=guidance,
             llm_provider=llm_provider,
-            api_key=api_key
+            api_key=api_key,
+            template_analysis=template_analysis,
+            long_document=long_document,
+            input_format=input_format
         )
         
-        if not slide_data:
-            raise ValueError("LLM failed to generate slide content.")
-
-        # 2. Create PPT with template styling
-        safe_filename = f"{filename.replace(' ', '_')}.pptx"
-        output_path = os.path.join(temp_dir, safe_filename)
-        
-        create_ppt_from_template(
-            slide_data=slide_data,
-            output_path=output_path,
-            template_path=template_path
-        )
-        
-        # 3. Add the cleanup task to run AFTER the response is sent
-        background_tasks.add_task(cleanup_directory, temp_dir)
-
-        # 4. Return the response. The file will exist until the download is complete.
-        return FileResponse(
-            path=output_path,
-            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-            filename=safe_filename
-        )
+        # 3. Send the rendered bytes back as they are, without another copy
+        return pptx_response(deck, safe_filename(filename))
         
+    except EmptyMarkdown as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        # If an error occurs, still clean up the directory
-        cleanup_directory(temp_dir)
         print("=== Exception in /generate-ppt ===")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
     
+# Documents rendered concurrently within one batch request, and the batch size cap.
+BATCH_CONCURRENCY = env_int("BATCH_CONCURRENCY", 8)
+BATCH_MAX_DOCUMENTS = env_int("BATCH_MAX_DOCUMENTS", 500)
+
+@app.post("/generate-ppt/batch")
+async def generate_ppt_batch(
+    text_contents: List[str] = Form(...),
+    document_names: List[str] = Form([]),
+    guidance: str = Form(""),
+    llm_provider: str = Form(...),
+    api_key: str = Form(""),
+    template_file: Optional[UploadFile] = File(None),
+    template_id: Optional[str] = Form(None),
+    output: str = Form("zip"),
+    long_document: Optional[bool] = Form(None),
+    input_format: str = Form("text")
+):
+    """
+    Render many documents against one template in a single call.
+    Send one text_contents field per document (and optionally a matching
+    document_names field). output="zip" streams a zip of the decks plus
+    manifest.json; output="manifest" returns per-document results whose
+    decks are fetched from result_url.
+    """
+    if output not in ("zip", "manifest"):
+        raise HTTPException(status_code=422, detail="output must be 'zip' or 'manifest'")
+    check_input_format(input_format)
+    check_llm_provider(llm_provider)
+    if len(text_contents) > BATCH_MAX_DOCUMENTS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_DOCUMENTS} documents per batch.")
+    check_api_key(api_key, text_contents, guidance, llm_provider, input_format)
+    
+    # Parse the template once; every deck in the batch renders against it
+    template_analysis = await load_registered_template(template_id) if template_id else None
+    if template_file and template_analysis is None:
+        template_analysis = await analyze_uploaded_template(template_file)
+    
+    names = safe_document_names(document_names, len(text_contents))
+    
+    async def render(index: int) -> bytes:
+        return await generate_deck(
+            text_content=text_contents[index],
+            guidance=guidance,
+            llm_provider=llm_provider,
+            api_key=api_key,
+            template_analysis=template_analysis,
+            long_document=long_document,
+            input_format=input_format
+        )
+    
+    items = render_batch(len(text_contents), render, names, BATCH_CONCURRENCY)
+    
+    if output == "zip":
+        return StreamingResponse(
+            stream_zip(items, len(text_contents)),
+            media_type="application/zip",
+            headers={"Content-Disposition": "attachment; filename=decks.zip"},
+        )
+    
+    # Decks stay pinned until the manifest is sent, so no result_url in it can dangle;
+    # decks that do not fit under JOB_RESULT_MAX_BYTES are reported as failed instead
+    documents = [None] * len(text_contents)
+    pinned = []
+    try:
+        async for item in items:
+            if item["result"] is not None:
+                try:
+                    job = job_manager.add_completed(item["result"], item["name"], pin=True)
+                    pinned.append(job["id"])
+                except ResultBudgetFull as e:
+                    item = {**item, "status": "failed", "error": f"{e} Retry with fewer documents or output=zip.", "result": None}
+            entry = manifest_entry(item)
+            if item["result"] is not None:
+                entry["job_id"] = job["id"]
+                entry["result_url"] = f"/jobs/{job['id']}/result"
+            documents[item["index"]] = entry
+    except BaseException:
+        job_manager.unpin(pinned)
+        raise
+    
+    async def release():
+        # Runs on the event loop (not the thread pool) like every other JobManager call
+        job_manager.unpin(pinned)
+    
+    return JSONResponse({"documents": documents}, background=BackgroundTask(release))
+
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/generate-ppt/stream")
+async def generate_ppt_stream(
+    text_content: str = Form(...),
+    guidance: str = Form(""),
+    llm_provider: str = Form(...),
+    api_key: str = Form(""),
+    filename: str = Form(...),
+    template_file: Optional[UploadFile] = File(None),
+    template_id: Optional[str] = Form(None),
+    input_format: str = Form("text")
+):
+    """
+    Server-sent events version of /generate-ppt.
+    Slides are rendered as soon as the LLM finishes each one, with a "slide"
+    event per slide and a final "done" event pointing at the finished deck.
+    """
+    check_input_format(input_format)
+    check_llm_provider(llm_provider)
+    check_api_key(api_key, [text_content], guidance, llm_provider, input_format)
+    template_analysis = await load_registered_template(template_id) if template_id else None
+    if template_file and template_analysis is None:
+        template_analysis = await analyze_uploaded_template(template_file)
+    deck_filename = safe_filename(filename)
+    
+    async def events():
+        # python-pptx work runs in worker threads so slides render while other requests are served
+        try:
+            try:
+                builder = await asyncio.to_thread(DeckBuilder, template_analysis)
+            except Exception as e:
+                print(f"Error with template processing: {e}")
+                builder = await asyncio.to_thread(DeckBuilder)
+            
+            async for slide in stream_slide_content(
+                text_content=text_content,
+                guidance=guidance,
+                llm_provider=llm_provider,
+                api_key=api_key,
+                input_format=input_format
+            ):
+                await asyncio.to_thread(builder.add_slide, slide)
+                yield sse_event("slide", {"index": builder.slide_count, "title": slide.get("title", "")})
+            
+            if not builder.slide_count:
+                raise ValueError("LLM failed to generate slide content.")
+            
+            output = io.BytesIO()
+            await asyncio.to_thread(builder.save, output)
+            job = job_manager.add_completed(output.getvalue(), deck_filename)
+            yield sse_event("done", {"slides": builder.slide_count, **job_status(job)})
+        
+        except Exception as e:
+            print("=== Exception in /generate-ppt/stream ===")
+            import traceback
+            traceback.print_exc()
+            yield sse_event("error", {"detail": f"An error occurred: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    text_content: str = Form(...),
+    guidance: str = Form(""),
+    llm_provider: str = Form(...),
+    api_key: str = Form(""),
+    filename: str = Form(...),
+    template_file: Optional[UploadFile] = File(None),
+    template_id: Optional[str] = Form(None),
+    long_document: Optional[bool] = Form(None),
+    input_format: str = Form("text")
+):
+    """Queue a deck for generation and return its job ID immediately."""
+    check_input_format(input_format)
+    check_llm_provider(llm_provider)
+    check_api_key(api_key, [text_content], guidance, llm_provider, input_format)
+    template_analysis = await load_registered_template(template_id) if template_id else None
+    if template_file and template_analysis is None:
+        template_analysis = await analyze_uploaded_template(template_file)
+    
+    async def run():
+        return await generate_deck(
+            text_content=text_content,
+            guidance=guidance,
+            llm_provider=llm_provider,
+            api_key=api_key,
+            template_analysis=template_analysis,
+            long_document=long_document,
+            input_format=input_format
+        )
+    
+    try:
+        job = job_manager.submit(run, filename=safe_filename(filename))
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return job_status(job)
+
+def get_job_or_404(job_id: str):
+    # Callers are async endpoints: JobManager is only ever touched from the event loop
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    return job_status(get_job_or_404(job_id))
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = get_job_or_404(job_id)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Job failed: {job['error']}")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; poll /jobs/{job_id} until it succeeds.")
+    return pptx_response(job["result"], job["filename"])
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms and cache/LLM counters."""
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Add this to main.py
 
 @app.get("/")
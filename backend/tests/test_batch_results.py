@@ -0,0 +1,52 @@
+import os
+
+os.environ.setdefault("WARMUP", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from core.jobs import JobManager, ResultBudgetFull
+
+
+def _manifest(client, count):
+    response = client.post(
+        "/generate-ppt/batch",
+        data={
+            "text_contents": [f"Document {i}. It has a few sentences about topic {i}." for i in range(count)],
+            "llm_provider": "offline",
+            "output": "manifest",
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["documents"]
+
+
+def test_pinned_results_are_not_evicted():
+    jobs = JobManager(max_result_bytes=250)
+    pinned = [jobs.add_completed(b"x" * 100, f"{i}.pptx", pin=True)["id"] for i in range(2)]
+    other = jobs.add_completed(b"y" * 100, "other.pptx")["id"]
+    with pytest.raises(ResultBudgetFull):
+        jobs.add_completed(b"z" * 100, "z.pptx", pin=True)
+    assert all(jobs.get(job_id) is not None for job_id in pinned)
+    assert jobs.get(other) is not None
+
+    jobs.unpin(pinned)
+    jobs.add_completed(b"w" * 100, "w.pptx")
+    assert jobs.get(pinned[0]) is None
+
+
+def test_batch_larger_than_result_budget_has_no_dangling_urls(monkeypatch):
+    with TestClient(main.app) as client:
+        deck_size = _manifest(client, 1)[0]["size"]
+        # Room for two of the five decks
+        monkeypatch.setattr(main.job_manager, "max_result_bytes", int(deck_size * 2.5))
+
+        documents = _manifest(client, 5)
+        with_urls = [entry for entry in documents if "result_url" in entry]
+        assert 0 < len(with_urls) < len(documents)
+        for entry in documents:
+            if "result_url" not in entry:
+                assert entry["status"] == "failed" and entry["error"]
+        for entry in with_urls:
+            assert client.get(entry["result_url"]).status_code == 200